@@ -1,24 +1,63 @@
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify, abort
+import hashlib
+import json
 import sqlite3
 
+from subscope_core import (ATTACH_LIMIT, TIME_BUCKETS, attach_shards, connect, format_time, match_clause, shard_paths, timeline_query,
+                           timeline_record)
+
 app = Flask(__name__)
 
+# Columns served for each dashboard table, in the order the DataTables columns are declared
+TABLE_COLUMNS = {
+    'programs': ['program', 'created_at'],
+    'domains': ['domain', 'program', 'scope', 'created_at', 'updated_at'],
+    'subdomains': ['subdomain', 'domain', 'program', 'source', 'scope', 'resolved', 'ip_address', 'cdn_status', 'cdn_name',
+                   'created_at', 'updated_at'],
+    'urls': ['url', 'subdomain', 'domain', 'program', 'scheme', 'method', 'port', 'status_code', 'scope', 'ip_address',
+             'cdn_status', 'cdn_name', 'title', 'webserver', 'webtech', 'cname', 'location', 'created_at', 'updated_at'],
+    'cidrs': ['ip', 'program', 'cidr', 'asn', 'port', 'service', 'cves', 'created_at', 'updated_at'],
+}
+
+# Epoch columns: sorted as stored, but filtered and searched on the local time text the table shows
+TIME_COLUMNS = {'created_at', 'updated_at'}
+
+# Largest page a client may ask for; DataTables' "show all" (length=-1) is capped to this too
+MAX_PAGE_LENGTH = 1000
+
+# Longest window the growth chart may request, in days
+MAX_TIMELINE_DAYS = 3660
+
 # Function to connect to the SQLite database
 def get_db_connection():
-    conn = sqlite3.connect('scopes.db')
+    conn = connect(profile='read-heavy')
+    # Programs kept in their own database file are read through TEMP VIEWs over the attached shards
+    shards = shard_paths(conn)
+    if 0 < len(shards) <= ATTACH_LIMIT:
+        attach_shards(conn, list(shards.values()))
     conn.row_factory = sqlite3.Row  # Access columns by name
     return conn
 
 # Basic Query String Construction Helper
-def build_query(filters, table_name):
-    query = f"SELECT * FROM {table_name} WHERE "
+def build_query(filters, table_name, columns='*', search=None, search_columns=()):
+    query = f"SELECT {columns} FROM {table_name} WHERE "
     conditions = []
     parameters = []
 
+    # Column filters match like the CLI list commands (a *.host.example.com subdomain is an indexed range)
     for column, value in filters.items():
         if value:
-            conditions.append(f"{column} LIKE ?")
-            parameters.append(f"%{value}%")
+            if column in TIME_COLUMNS:
+                column = TIME_BUCKETS['second'].format(column=column)
+            condition, values = match_clause(column, value)
+            conditions.append(condition)
+            parameters.extend(values)
+
+    # Global search box: a row matches if any of the searchable columns contains the text
+    if search:
+        conditions.append("(" + " OR ".join(f"{TIME_BUCKETS['second'].format(column=column) if column in TIME_COLUMNS else column} LIKE ?"
+                                            for column in search_columns) + ")")
+        parameters.extend(f"%{search}%" for _ in search_columns)
 
     if conditions:
         query += " AND ".join(conditions)
@@ -27,32 +66,133 @@ def build_query(filters, table_name):
 
     return query, parameters
 
+def page_cursor(page_key, start, after):
+    # The cursor a client sends back is only used for the page it was issued for: the same query, order and offset
+    if not start or not after:
+        return None
+    try:
+        cursor = json.loads(after)
+        value, rowid = cursor['key']
+        if cursor['start'] == start and cursor['query'] == query_digest(page_key) and isinstance(rowid, int):
+            return value, rowid
+    except (ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def query_digest(page_key):
+    return hashlib.sha1(repr(page_key).encode()).hexdigest()
+
+def seek_condition(column, descending, value, rowid):
+    # Rows after (value, rowid) in the page order. NULLs sort first, so they lead an ascending order and trail a
+    # descending one, and a row-value comparison against NULL matches nothing: they get their own terms
+    if column == 'rowid':
+        return f"_rowid {'<' if descending else '>'} ?", [rowid]
+    if descending:
+        if value is None:
+            return f"{column} IS NULL AND _rowid < ?", [rowid]
+        return f"({column} IS NULL OR ({column}, _rowid) < (?, ?))", [value, rowid]
+    if value is None:
+        return f"({column} IS NOT NULL OR _rowid > ?)", [rowid]
+    return f"({column}, _rowid) > (?, ?)", [value, rowid]
+
 @app.route('/')
 def index():
     conn = get_db_connection()
 
-    # Fetch all data for rendering on page load
-    programs = conn.execute('SELECT * FROM programs').fetchall()
-    domains = conn.execute('SELECT * FROM domains').fetchall()
-    subdomains = conn.execute('SELECT * FROM subdomains').fetchall()
-    resolved = conn.execute('SELECT * FROM subdomains WHERE resolved="yes"').fetchall()
-    urls = conn.execute('SELECT * FROM urls').fetchall()
-    cidrs = conn.execute('SELECT * FROM cidrs').fetchall()
-
-    # Calculate overview data
-    programs_count = len(programs)
-    domains_count = len(domains)
-    subdomains_count = len(subdomains)
-    urls_count = len(urls)
-    cidrs_count = len(cidrs)
-    resolved_count = len(resolved)
-
-    return render_template('index.html', 
-                           programs=programs, domains=domains, subdomains=subdomains, 
-                           urls=urls, cidrs=cidrs,
-                           programs_count=programs_count, domains_count=domains_count, 
-                           subdomains_count=subdomains_count, urls_count=urls_count, 
-                           cidrs_count=cidrs_count, resolved_count=resolved_count)
+    # Overview counts come from the counters kept on programs by triggers, not from loading the tables
+    programs_count, domains_count, subdomains_count, urls_count, cidrs_count = conn.execute(
+        'SELECT COUNT(*), TOTAL(domains), TOTAL(subdomains), TOTAL(urls), TOTAL(ips) FROM programs').fetchone()
+    resolved_count = conn.execute("SELECT COUNT(*) FROM subdomains WHERE resolved = 'yes'").fetchone()[0]
+    conn.close()
+
+    # Table rows are fetched page by page from /api/<table>
+    return render_template('index.html',
+                           programs_count=programs_count, domains_count=int(domains_count),
+                           subdomains_count=int(subdomains_count), urls_count=int(urls_count),
+                           cidrs_count=int(cidrs_count), resolved_count=resolved_count)
+
+@app.route('/api/<table>')
+def table_data(table):
+    # DataTables server-side processing: paging, sorting and searching all happen in SQL
+    if table not in TABLE_COLUMNS:
+        abort(404)
+    columns = TABLE_COLUMNS[table]
+    args = request.args
+
+    draw = args.get('draw', 0, type=int)
+    start = max(args.get('start', 0, type=int), 0)
+    length = args.get('length', 10, type=int)
+    if length < 0 or length > MAX_PAGE_LENGTH:
+        length = MAX_PAGE_LENGTH
+
+    order_index = args.get('order[0][column]', type=int)
+    order_column = columns[order_index] if order_index is not None and 0 <= order_index < len(columns) else 'rowid'
+    descending = args.get('order[0][dir]') == 'desc'
+
+    filters = {column: args.get(f'columns[{i}][search][value]') for i, column in enumerate(columns)}
+    search = args.get('search[value]')
+
+    conn = get_db_connection()
+    try:
+        records_total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        count_query, parameters = build_query(filters, table, 'COUNT(*)', search, columns)
+        records_filtered = conn.execute(count_query, parameters).fetchone()[0] if parameters else records_total
+
+        query, parameters = build_query(filters, table, 'rowid AS _rowid, ' + ', '.join(columns), search, columns)
+        direction = 'DESC' if descending else 'ASC'
+        page_key = (table, query, tuple(parameters), order_column, direction)
+
+        # Seek past the last row of the page the client is showing, from the cursor it got with that page; a jump
+        # to any other page falls back to OFFSET
+        seek = page_cursor(page_key, start, args.get('after'))
+        if seek:
+            condition, seek_parameters = seek_condition(order_column, descending, *seek)
+            query = f"SELECT * FROM ({query}) WHERE {condition}"
+            parameters = parameters + seek_parameters
+            offset = 0
+        else:
+            offset = start
+
+        if order_column == 'rowid':
+            query += f" ORDER BY _rowid {direction}"
+        else:
+            query += f" ORDER BY {order_column} {direction}, _rowid {direction}"
+        query += " LIMIT ? OFFSET ?"
+        rows = conn.execute(query, parameters + [length, offset]).fetchall()
+    finally:
+        conn.close()
+
+    # Cursor for the next page: the key of the last row served. It travels with the client instead of living in a
+    # server-side cache, so it always marks the rows the user actually saw, whatever was inserted or deleted since.
+    # Rows read through the shard views have no rowid to seek from; their next page uses OFFSET
+    cursor = None
+    if rows and rows[-1]['_rowid'] is not None:
+        last = rows[-1]
+        cursor = {'start': start + len(rows), 'query': query_digest(page_key),
+                  'key': [last['_rowid'] if order_column == 'rowid' else last[order_column], last['_rowid']]}
+
+    return jsonify({
+        'draw': draw,
+        'recordsTotal': records_total,
+        'recordsFiltered': records_filtered,
+        'next': cursor,
+        'data': [{column: format_time(row[column]) if column in TIME_COLUMNS else row[column] for column in columns} for row in rows],
+    })
+
+@app.route('/api/timeline/<program>')
+def timeline_data(program):
+    # Chart data: per-day growth of a program ('*' for all) from the daily_growth rollup, a few rows per day
+    days = min(max(request.args.get('days', 90, type=int), 1), MAX_TIMELINE_DAYS)
+    domain = request.args.get('domain') or None
+    by_domain = request.args.get('by_domain') in ('1', 'true')
+
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(*timeline_query(program, days, domain, by_domain)).fetchall()
+    finally:
+        conn.close()
+
+    return jsonify({'program': program, 'days': days, 'timeline': [timeline_record(tuple(row), by_domain) for row in rows]})
 
 if __name__ == '__main__':
     app.run(debug=True)
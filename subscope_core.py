@@ -0,0 +1,3752 @@
+import argparse
+import colorama
+import sqlite3
+import json
+import re
+import os
+import sys
+
+from datetime import datetime, timedelta
+from colorama import Fore, Back, Style
+
+# Database file shared by the CLI and the dashboard
+DB_PATH = os.environ.get('SUBSCOPE_DB', 'scopes.db')
+
+# Directory of the per-program database files ("shards") listed in the catalogue table of DB_PATH
+SHARD_DIR = os.path.abspath(os.environ.get('SUBSCOPE_SHARD_DIR', DB_PATH + '.shards'))
+
+# Databases SQLite lets one connection attach; a cross-program read over more shards than this cannot be answered
+ATTACH_LIMIT = 10
+
+# Milliseconds a connection keeps retrying while another process holds the write lock
+BUSY_TIMEOUT = 30000
+
+# Storage profiles: PRAGMA values applied on top of WAL journaling for each kind of workload
+STORAGE_PROFILES = {
+    'default': {'synchronous': 'NORMAL', 'cache_size': -16384, 'mmap_size': 0, 'temp_store': 'DEFAULT'},
+    # Large imports: no fsync per commit (a crash may lose the last transactions) and a big page cache
+    'bulk-ingest': {'synchronous': 'OFF', 'cache_size': -262144, 'mmap_size': 0, 'temp_store': 'MEMORY'},
+    # Dashboard and list commands: memory-mapped reads and in-memory sorts
+    'read-heavy': {'synchronous': 'NORMAL', 'cache_size': -65536, 'mmap_size': 268435456, 'temp_store': 'MEMORY'},
+}
+
+def apply_profile(connection, profile):
+    for pragma, value in STORAGE_PROFILES[profile].items():
+        connection.execute(f"PRAGMA {pragma} = {value}")
+
+def regexp(pattern, value):
+    # SQLite's `X REGEXP Y` calls regexp(Y, X); re caches the compiled patterns
+    return value is not None and re.search(pattern, str(value)) is not None
+
+def connect(path=DB_PATH, profile='default', cached_statements=128):
+    # WAL lets the dashboard keep reading while the CLI writes; the busy timeout makes writers queue instead of failing
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT / 1000, cached_statements=cached_statements)
+    connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT}")
+    connection.execute("PRAGMA journal_mode = WAL")
+    apply_profile(connection, profile)
+    connection.create_function('REGEXP', 2, regexp, deterministic=True)
+    return connection
+
+# Unix socket of `subscope serve`; when it exists the CLI forwards commands to the daemon
+SOCKET_PATH = os.environ.get('SUBSCOPE_SOCKET', DB_PATH + '.sock')
+
+# The daemon keeps one connection open, so it can afford a large prepared-statement cache
+SERVE_CACHED_STATEMENTS = 1024
+
+# Most requests committed together by the daemon when several are waiting
+GROUP_COMMIT_MAX = 256
+
+# Characters of a forwarded command's output the daemon holds before sending them on to the client
+REPLY_CHUNK_SIZE = 65536
+
+# Opened by open_database() once a command that needs the database has been parsed
+conn = None
+cursor = None
+
+# Number of lines handled per batched statement during bulk ingest
+INGEST_CHUNK_SIZE = 500
+
+# Rows pulled from the cursor per fetchmany() call when streaming --format ndjson
+FETCH_BATCH_SIZE = 1000
+
+# Columns added after the first releases; older scopes.db files get them on upgrade
+LEGACY_COLUMNS = {
+    'programs': [('domains', 'INTEGER'), ('subdomains', 'INTEGER'), ('urls', 'INTEGER'), ('ips', 'INTEGER')],
+    'domains': [('subdomains', 'INTEGER'), ('urls', 'INTEGER')],
+    'subdomains': [('urls', 'INTEGER')],
+    'urls': [('path', 'TEXT'), ('flag', 'TEXT'), ('content_length', 'TEXT')],
+}
+
+# Triggers keeping the denormalized counters of programs, domains and subdomains in step with every insert and delete
+COUNTER_TRIGGERS = {
+    'count_domains_insert': """CREATE TRIGGER count_domains_insert AFTER INSERT ON domains BEGIN
+        UPDATE programs SET domains = COALESCE(domains, 0) + 1 WHERE program = NEW.program;
+    END""",
+    'count_domains_delete': """CREATE TRIGGER count_domains_delete AFTER DELETE ON domains BEGIN
+        UPDATE programs SET domains = COALESCE(domains, 0) - 1 WHERE program = OLD.program;
+    END""",
+    'count_subdomains_insert': """CREATE TRIGGER count_subdomains_insert AFTER INSERT ON subdomains BEGIN
+        UPDATE programs SET subdomains = COALESCE(subdomains, 0) + 1 WHERE program = NEW.program;
+        UPDATE domains SET subdomains = COALESCE(subdomains, 0) + 1 WHERE domain = NEW.domain AND program = NEW.program;
+    END""",
+    'count_subdomains_delete': """CREATE TRIGGER count_subdomains_delete AFTER DELETE ON subdomains BEGIN
+        UPDATE programs SET subdomains = COALESCE(subdomains, 0) - 1 WHERE program = OLD.program;
+        UPDATE domains SET subdomains = COALESCE(subdomains, 0) - 1 WHERE domain = OLD.domain AND program = OLD.program;
+    END""",
+    'count_urls_insert': """CREATE TRIGGER count_urls_insert AFTER INSERT ON urls BEGIN
+        UPDATE programs SET urls = COALESCE(urls, 0) + 1 WHERE program = NEW.program;
+        UPDATE domains SET urls = COALESCE(urls, 0) + 1 WHERE domain = NEW.domain AND program = NEW.program;
+        UPDATE subdomains SET urls = COALESCE(urls, 0) + 1 WHERE subdomain = NEW.subdomain AND domain = NEW.domain AND program = NEW.program;
+    END""",
+    'count_urls_delete': """CREATE TRIGGER count_urls_delete AFTER DELETE ON urls BEGIN
+        UPDATE programs SET urls = COALESCE(urls, 0) - 1 WHERE program = OLD.program;
+        UPDATE domains SET urls = COALESCE(urls, 0) - 1 WHERE domain = OLD.domain AND program = OLD.program;
+        UPDATE subdomains SET urls = COALESCE(urls, 0) - 1 WHERE subdomain = OLD.subdomain AND domain = OLD.domain AND program = OLD.program;
+    END""",
+    'count_cidrs_insert': """CREATE TRIGGER count_cidrs_insert AFTER INSERT ON cidrs BEGIN
+        UPDATE programs SET ips = COALESCE(ips, 0) + 1 WHERE program = NEW.program;
+    END""",
+    'count_cidrs_delete': """CREATE TRIGGER count_cidrs_delete AFTER DELETE ON cidrs BEGIN
+        UPDATE programs SET ips = COALESCE(ips, 0) - 1 WHERE program = OLD.program;
+    END""",
+}
+
+def refresh_counts():
+    # Recompute every counter from scratch; only needed when the counter triggers are first installed
+    cursor.execute("""UPDATE programs SET
+        domains = (SELECT COUNT(*) FROM domains WHERE domains.program = programs.program),
+        subdomains = (SELECT COUNT(*) FROM subdomains WHERE subdomains.program = programs.program),
+        urls = (SELECT COUNT(*) FROM urls WHERE urls.program = programs.program),
+        ips = (SELECT COUNT(*) FROM cidrs WHERE cidrs.program = programs.program)""")
+    cursor.execute("""UPDATE domains SET
+        subdomains = (SELECT COUNT(*) FROM subdomains WHERE subdomains.program = domains.program AND subdomains.domain = domains.domain),
+        urls = (SELECT COUNT(*) FROM urls WHERE urls.program = domains.program AND urls.domain = domains.domain)""")
+    cursor.execute("""UPDATE subdomains SET
+        urls = (SELECT COUNT(*) FROM urls WHERE urls.program = subdomains.program AND urls.domain = subdomains.domain AND urls.subdomain = subdomains.subdomain)""")
+
+# Secondary indexes matching the filters used by the list, delete and counter queries
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_domains_program ON domains (program)",
+    "CREATE INDEX IF NOT EXISTS idx_subdomains_program_domain ON subdomains (program, domain)",
+    "CREATE INDEX IF NOT EXISTS idx_subdomains_domain ON subdomains (domain)",
+    "CREATE INDEX IF NOT EXISTS idx_subdomains_created_at ON subdomains (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_subdomains_updated_at ON subdomains (updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_urls_program_domain_subdomain ON urls (program, domain, subdomain)",
+    "CREATE INDEX IF NOT EXISTS idx_urls_domain ON urls (domain)",
+    "CREATE INDEX IF NOT EXISTS idx_urls_created_at ON urls (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_urls_updated_at ON urls (updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_cidrs_program ON cidrs (program)",
+    "CREATE INDEX IF NOT EXISTS idx_cidrs_created_at ON cidrs (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_cidrs_updated_at ON cidrs (updated_at)",
+]
+
+def migrate_v1():
+    # Base tables, plus the columns older databases are missing
+    cursor.execute("CREATE TABLE IF NOT EXISTS programs (program TEXT PRIMARY KEY, domains INTEGER, subdomains INTEGER, urls INTEGER, ips INTEGER, created_at TEXT)")
+    cursor.execute("CREATE TABLE IF NOT EXISTS domains (domain TEXT PRIMARY KEY, program TEXT, scope TEXT, subdomains INTEGER, urls INTEGER, created_at TEXT, updated_at TEXT, FOREIGN KEY(program) REFERENCES programs(program))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS subdomains (subdomain TEXT, domain TEXT, program TEXT, source TEXT, scope TEXT, urls INTEGER, resolved TEXT, ip_address TEXT, cdn_status TEXT, cdn_name TEXT, created_at TEXT, updated_at TEXT, PRIMARY KEY(subdomain, domain, program))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT, subdomain TEXT, domain TEXT, program TEXT, scheme TEXT, method TEXT, port INTEGER, path TEXT, flag TEXT, status_code INTEGER, scope TEXT, content_length TEXT, ip_address TEXT, cdn_status TEXT, cdn_name TEXT, title TEXT, webserver TEXT, webtech TEXT, cname TEXT, location TEXT, created_at TIMESTAMP, updated_at TIMESTAMP, PRIMARY KEY(url, subdomain, domain, program))")
+    cursor.execute("CREATE TABLE IF NOT EXISTS cidrs (ip TEXT NOT NULL, program TEXT NOT NULL, cidr TEXT, asn INTEGER, port TEXT, service TEXT, cves TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL, PRIMARY KEY(ip, program))")
+    for table, columns in LEGACY_COLUMNS.items():
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+        for column, column_type in columns:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+def migrate_v2():
+    # Counter triggers, then a single resync of the counters they maintain from now on
+    installed = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall()}
+    for name, sql in COUNTER_TRIGGERS.items():
+        if name not in installed:
+            cursor.execute(sql)
+    refresh_counts()
+
+def migrate_v3():
+    for sql in INDEXES:
+        cursor.execute(sql)
+    cursor.execute("ANALYZE")
+
+# Keeps subdomains.source as a sorted display copy of subdomain_sources and drops the sources of deleted subdomains.
+# A list that already names (or no longer names) the source is left alone: writers that set the whole list with the
+# row get one change logged, not one more per source
+SOURCE_LIST_SQL = "COALESCE((SELECT group_concat(source, ', ') FROM (SELECT source FROM subdomain_sources WHERE subdomain = {row}.subdomain AND domain = {row}.domain AND program = {row}.program ORDER BY source)), '')"
+
+SOURCE_TRIGGERS = {
+    'sources_insert': f"""CREATE TRIGGER sources_insert AFTER INSERT ON subdomain_sources BEGIN
+        UPDATE subdomains SET source = {SOURCE_LIST_SQL.format(row='NEW')} WHERE subdomain = NEW.subdomain AND domain = NEW.domain AND program = NEW.program
+            AND instr(', ' || source || ', ', ', ' || NEW.source || ', ') = 0;
+    END""",
+    'sources_delete': f"""CREATE TRIGGER sources_delete AFTER DELETE ON subdomain_sources BEGIN
+        UPDATE subdomains SET source = {SOURCE_LIST_SQL.format(row='OLD')} WHERE subdomain = OLD.subdomain AND domain = OLD.domain AND program = OLD.program
+            AND instr(', ' || source || ', ', ', ' || OLD.source || ', ') > 0;
+    END""",
+    'sources_subdomain_delete': """CREATE TRIGGER sources_subdomain_delete AFTER DELETE ON subdomains BEGIN
+        DELETE FROM subdomain_sources WHERE subdomain = OLD.subdomain AND domain = OLD.domain AND program = OLD.program;
+    END""",
+}
+
+def migrate_v4():
+    # One indexed row per (subdomain, source) instead of the comma-joined subdomains.source string
+    cursor.execute("CREATE TABLE IF NOT EXISTS subdomain_sources (subdomain TEXT, domain TEXT, program TEXT, source TEXT, first_seen TIMESTAMP, last_seen TIMESTAMP, PRIMARY KEY(subdomain, domain, program, source))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_subdomain_sources_source ON subdomain_sources (source, program, domain)")
+
+    rows = conn.execute("SELECT subdomain, domain, program, source, created_at, updated_at FROM subdomains WHERE source IS NOT NULL AND source != ''")
+    for chunk in chunked(rows):
+        cursor.executemany("INSERT OR IGNORE INTO subdomain_sources (subdomain, domain, program, source, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                           [(subdomain, domain, program, source, created_at, updated_at)
+                            for subdomain, domain, program, source_str, created_at, updated_at in chunk
+                            for source in split_sources([source_str])])
+
+    for sql in SOURCE_TRIGGERS.values():
+        cursor.execute(sql)
+
+def migrate_v5():
+    # Sortable binary form of every IP so address and CIDR lookups become indexed range scans
+    cursor.execute("ALTER TABLE cidrs ADD COLUMN ip_key BLOB")
+    rows = conn.execute("SELECT rowid, ip FROM cidrs")
+    for chunk in chunked(rows):
+        cursor.executemany("UPDATE cidrs SET ip_key = ? WHERE rowid = ?", [(ip_key(ip), rowid) for rowid, ip in chunk])
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cidrs_ip_key ON cidrs (ip_key)")
+
+# cidrs.port stays as a display cache of the IP's ports, kept sorted by the ip_ports triggers
+PORT_LIST_SQL = "COALESCE((SELECT group_concat(port, ', ') FROM (SELECT port FROM ip_ports WHERE ip = {row}.ip AND program = {row}.program ORDER BY port)), 'none')"
+
+PORT_TRIGGERS = {
+    'ports_insert': f"""CREATE TRIGGER ports_insert AFTER INSERT ON ip_ports BEGIN
+        UPDATE cidrs SET port = {PORT_LIST_SQL.format(row='NEW')} WHERE ip = NEW.ip AND program = NEW.program;
+    END""",
+    'ports_delete': f"""CREATE TRIGGER ports_delete AFTER DELETE ON ip_ports BEGIN
+        UPDATE cidrs SET port = {PORT_LIST_SQL.format(row='OLD')} WHERE ip = OLD.ip AND program = OLD.program;
+    END""",
+    'ports_cidr_delete': """CREATE TRIGGER ports_cidr_delete AFTER DELETE ON cidrs BEGIN
+        DELETE FROM ip_ports WHERE ip = OLD.ip AND program = OLD.program;
+    END""",
+}
+
+def split_ports(value):
+    # Ports out of the legacy "80, 443" strings; anything that is not a port number is dropped
+    ports = []
+    for part in str(value or '').replace(',', ' ').split():
+        if part.isdigit() and 0 <= int(part) <= 65535:
+            ports.append(int(part))
+    return list(dict.fromkeys(ports))
+
+def migrate_v6():
+    # One indexed row per (ip, port), with the service seen on that port, instead of the comma-joined cidrs.port string
+    cursor.execute("CREATE TABLE IF NOT EXISTS ip_ports (ip TEXT, program TEXT, port INTEGER, service TEXT, first_seen TIMESTAMP, last_seen TIMESTAMP, PRIMARY KEY(ip, program, port))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ip_ports_port ON ip_ports (port, program)")
+
+    rows = conn.execute("SELECT ip, program, port, service, created_at, updated_at FROM cidrs WHERE port IS NOT NULL AND port != 'none'")
+    for chunk in chunked(rows):
+        cursor.executemany("INSERT OR IGNORE INTO ip_ports (ip, program, port, service, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                           [(ip, program, port, service if service not in (None, 'none') else None, created_at, updated_at)
+                            for ip, program, port_str, service, created_at, updated_at in chunk
+                            for port in split_ports(port_str)])
+
+    for sql in PORT_TRIGGERS.values():
+        cursor.execute(sql)
+
+# cidrs.cves stays as a display cache of the IP's CVEs, kept sorted by the ip_cves triggers
+CVE_LIST_SQL = "COALESCE((SELECT group_concat(cve, ', ') FROM (SELECT cve FROM ip_cves WHERE ip = {row}.ip AND program = {row}.program ORDER BY cve)), 'none')"
+
+CVE_TRIGGERS = {
+    'cves_insert': f"""CREATE TRIGGER cves_insert AFTER INSERT ON ip_cves BEGIN
+        UPDATE cidrs SET cves = {CVE_LIST_SQL.format(row='NEW')} WHERE ip = NEW.ip AND program = NEW.program;
+    END""",
+    'cves_delete': f"""CREATE TRIGGER cves_delete AFTER DELETE ON ip_cves BEGIN
+        UPDATE cidrs SET cves = {CVE_LIST_SQL.format(row='OLD')} WHERE ip = OLD.ip AND program = OLD.program;
+    END""",
+    'cves_cidr_delete': """CREATE TRIGGER cves_cidr_delete AFTER DELETE ON cidrs BEGIN
+        DELETE FROM ip_cves WHERE ip = OLD.ip AND program = OLD.program;
+    END""",
+}
+
+def split_cves(values):
+    # CVE ids out of comma/space separated strings, upper-cased so lookups can use the index
+    cves = []
+    for value in values or []:
+        for part in str(value).replace(',', ' ').split():
+            if part.lower() != 'none':
+                cves.append(part.upper())
+    return list(dict.fromkeys(cves))
+
+def cve_filter(cve):
+    # A full CVE id is an exact lookup; anything shorter (CVE-2024, CVE-2024-12) is an indexed prefix match
+    cve = cve.strip().upper()
+    if cve.count('-') >= 2 and cve.rsplit('-', 1)[1].isdigit() and len(cve.rsplit('-', 1)[1]) >= 4:
+        return "cve = ?", cve
+    return "cve GLOB ?", cve + '*'
+
+def migrate_v7():
+    # Inverted CVE index: one row per (ip, cve), searchable by CVE across every program
+    cursor.execute("CREATE TABLE IF NOT EXISTS ip_cves (ip TEXT, program TEXT, cve TEXT, first_seen TIMESTAMP, last_seen TIMESTAMP, PRIMARY KEY(ip, program, cve))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ip_cves_cve ON ip_cves (cve, program)")
+
+    rows = conn.execute("SELECT ip, program, cves, created_at, updated_at FROM cidrs WHERE cves IS NOT NULL AND cves != 'none'")
+    for chunk in chunked(rows):
+        cursor.executemany("INSERT OR IGNORE INTO ip_cves (ip, program, cve, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                           [(ip, program, cve, created_at, updated_at)
+                            for ip, program, cves, created_at, updated_at in chunk
+                            for cve in split_cves([cves])])
+
+    for sql in CVE_TRIGGERS.values():
+        cursor.execute(sql)
+
+TECH_TRIGGERS = {
+    'tech_url_delete': """CREATE TRIGGER tech_url_delete AFTER DELETE ON urls BEGIN
+        DELETE FROM url_tech WHERE url = OLD.url AND subdomain = OLD.subdomain AND domain = OLD.domain AND program = OLD.program;
+    END""",
+}
+
+def version_key(version):
+    # Zero-pad the numeric parts so versions sort as text: "6.1.10" > "6.1.9" > "6"
+    if not version:
+        return None
+    return '.'.join(part.zfill(8) if part.isdigit() else part.lower()
+                    for part in re.split(r'[.\-_+]', version) if part)
+
+def split_webtech(value):
+    # (tech, version) pairs out of webtech strings such as "Nginx:1.18.0, PHP:7.4, WordPress"
+    techs = {}
+    for part in str(value or '').split(','):
+        part = part.strip()
+        if not part or part.lower() == 'none':
+            continue
+        tech, version = part, None
+        match = re.match(r'^(.*?)\s*[:/]\s*v?(\d[\w.\-+]*)$', part)
+        if match:
+            tech, version = match.group(1), match.group(2)
+        techs.setdefault(tech.lower(), (tech, version))
+    return list(techs.values())
+
+def sync_url_tech(rows):
+    # Replace the url_tech rows of each (url, subdomain, domain, program, webtech) with the parsed technologies
+    cursor.executemany("DELETE FROM url_tech WHERE url = ? AND subdomain = ? AND domain = ? AND program = ?",
+                       [row[:4] for row in rows])
+    cursor.executemany("INSERT OR IGNORE INTO url_tech (url, subdomain, domain, program, tech, version, version_key) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       [(*row[:4], tech, version, version_key(version)) for row in rows for tech, version in split_webtech(row[4])])
+
+def tech_filter(value):
+    # "WordPress" matches any version, "WordPress<6" / ">=" / "=" / ":" compare against the sortable version key
+    match = re.match(r'^\s*(.+?)\s*(<=|>=|!=|<|>|=|:)\s*v?(\d[\w.\-+]*)\s*$', value)
+    if not match:
+        return "SELECT url, subdomain, domain, program FROM url_tech WHERE tech = ?", [value.strip()]
+    tech, operator, version = match.groups()
+    operator = '=' if operator == ':' else operator
+    return f"SELECT url, subdomain, domain, program FROM url_tech WHERE tech = ? AND version_key {operator} ?", [tech, version_key(version)]
+
+def migrate_v8():
+    # One indexed row per (url, technology) with its version, instead of matching inside the urls.webtech string
+    cursor.execute("CREATE TABLE IF NOT EXISTS url_tech (url TEXT, subdomain TEXT, domain TEXT, program TEXT, tech TEXT COLLATE NOCASE, version TEXT, version_key TEXT, PRIMARY KEY(url, subdomain, domain, program, tech))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_url_tech_tech ON url_tech (tech, version_key, program)")
+
+    rows = conn.execute("SELECT url, subdomain, domain, program, webtech FROM urls WHERE webtech IS NOT NULL AND webtech != 'none'")
+    for chunk in chunked(rows):
+        sync_url_tech(chunk)
+
+    for sql in TECH_TRIGGERS.values():
+        cursor.execute(sql)
+
+# Full-text index over the descriptive url columns, stored as an external-content FTS5 table on urls
+URL_FTS_COLUMNS = ['title', 'path', 'location', 'cname', 'webserver']
+
+URL_FTS_TRIGGERS = {
+    'urls_fts_insert': f"""CREATE TRIGGER urls_fts_insert AFTER INSERT ON urls BEGIN
+        INSERT INTO urls_fts (rowid, {', '.join(URL_FTS_COLUMNS)}) VALUES (NEW.rowid, {', '.join('NEW.' + col for col in URL_FTS_COLUMNS)});
+    END""",
+    'urls_fts_delete': f"""CREATE TRIGGER urls_fts_delete AFTER DELETE ON urls BEGIN
+        INSERT INTO urls_fts (urls_fts, rowid, {', '.join(URL_FTS_COLUMNS)}) VALUES ('delete', OLD.rowid, {', '.join('OLD.' + col for col in URL_FTS_COLUMNS)});
+    END""",
+    'urls_fts_update': f"""CREATE TRIGGER urls_fts_update AFTER UPDATE OF {', '.join(URL_FTS_COLUMNS)} ON urls BEGIN
+        INSERT INTO urls_fts (urls_fts, rowid, {', '.join(URL_FTS_COLUMNS)}) VALUES ('delete', OLD.rowid, {', '.join('OLD.' + col for col in URL_FTS_COLUMNS)});
+        INSERT INTO urls_fts (rowid, {', '.join(URL_FTS_COLUMNS)}) VALUES (NEW.rowid, {', '.join('NEW.' + col for col in URL_FTS_COLUMNS)});
+    END""",
+}
+
+def create_url_fts():
+    # Build urls_fts and its sync triggers; returns False when this SQLite has no FTS5 module
+    try:
+        cursor.execute(f"CREATE VIRTUAL TABLE urls_fts USING fts5({', '.join(URL_FTS_COLUMNS)}, content='urls', content_rowid='rowid')")
+    except sqlite3.OperationalError:
+        return False
+    cursor.execute("INSERT INTO urls_fts (urls_fts) VALUES ('rebuild')")
+    for sql in URL_FTS_TRIGGERS.values():
+        cursor.execute(sql)
+    return True
+
+def migrate_v9():
+    # Without FTS5 the index is skipped here and built by the first `url search` on a build that has it
+    create_url_fts()
+
+def rev_host(host):
+    # Reversed-label key of a hostname: api.example.com -> com.example.api.
+    return '.'.join(reversed(str(host).strip().strip('.').lower().split('.'))) + '.'
+
+def host_suffix_filter(pattern):
+    # A *.api.example.com pattern as an indexed rev_host range over the subtree below api.example.com; None otherwise
+    if not pattern.startswith('*.') or '*' in pattern[2:] or '%' in pattern or len(pattern) < 3:
+        return None
+    prefix = rev_host(pattern[2:])
+    return "rev_host > ? AND rev_host < ?", [prefix, prefix[:-1] + '/']  # '/' sorts right after '.'
+
+def migrate_v10():
+    # Reversed hostnames so subtree (suffix) queries become prefix range scans
+    for table, host_column in (('subdomains', 'subdomain'), ('urls', 'subdomain')):
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN rev_host TEXT")
+        rows = conn.execute(f"SELECT rowid, {host_column} FROM {table}")
+        for chunk in chunked(rows):
+            cursor.executemany(f"UPDATE {table} SET rev_host = ? WHERE rowid = ?", [(rev_host(host), rowid) for rowid, host in chunk])
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_rev_host ON {table} (rev_host)")
+
+# Change log: table -> (entity name, key column, columns whose changes are recorded). Counters, timestamps
+# and lookup keys (urls, rev_host, ip_key...) are left out so touching a row is not reported as a change
+CHANGE_COLUMNS = {
+    'domains': ('domain', 'domain', ['scope']),
+    'subdomains': ('subdomain', 'subdomain', ['domain', 'source', 'scope', 'resolved', 'ip_address', 'cdn_status', 'cdn_name']),
+    'urls': ('url', 'url', ['subdomain', 'domain', 'scheme', 'method', 'port', 'path', 'flag', 'status_code', 'scope', 'content_length',
+                            'ip_address', 'cdn_status', 'cdn_name', 'title', 'webserver', 'webtech', 'cname', 'location']),
+    'cidrs': ('ip', 'ip', ['cidr', 'asn', 'port', 'service', 'cves']),
+}
+
+def change_triggers(table):
+    # Insert/update/delete triggers appending to changes; an update records only the columns that changed
+    entity, key, columns = CHANGE_COLUMNS[table]
+    changed = ' OR '.join(f"NEW.{col} IS NOT OLD.{col}" for col in columns)
+    diff = ' UNION ALL '.join(f"SELECT '{col}' AS name, NEW.{col} AS value WHERE NEW.{col} IS NOT OLD.{col}" for col in columns)
+    return {
+        f'changes_{table}_insert': f"""CREATE TRIGGER changes_{table}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO changes (changed_at, op, entity, program, key, fields)
+            VALUES (CAST(strftime('%s', 'now') AS INTEGER), 'insert', '{entity}', NEW.program, NEW.{key}, json_object({', '.join(f"'{col}', NEW.{col}" for col in columns)}));
+        END""",
+        f'changes_{table}_update': f"""CREATE TRIGGER changes_{table}_update AFTER UPDATE ON {table} WHEN {changed} BEGIN
+            INSERT INTO changes (changed_at, op, entity, program, key, fields)
+            VALUES (CAST(strftime('%s', 'now') AS INTEGER), 'update', '{entity}', NEW.program, NEW.{key}, (SELECT json_group_object(name, value) FROM ({diff})));
+        END""",
+        f'changes_{table}_delete': f"""CREATE TRIGGER changes_{table}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO changes (changed_at, op, entity, program, key, fields)
+            VALUES (CAST(strftime('%s', 'now') AS INTEGER), 'delete', '{entity}', OLD.program, OLD.{key}, NULL);
+        END""",
+    }
+
+def migrate_v11():
+    # Append-only change log; AUTOINCREMENT keeps sequence numbers strictly increasing, never reused
+    cursor.execute("CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, changed_at TIMESTAMP, op TEXT, entity TEXT, program TEXT, key TEXT, fields TEXT)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_changes_changed_at ON changes (changed_at)")
+    for table in CHANGE_COLUMNS:
+        for sql in change_triggers(table).values():
+            cursor.execute(sql)
+
+def migrate_v12():
+    # Catalogue of the programs that live in their own database file under SHARD_DIR
+    cursor.execute("CREATE TABLE IF NOT EXISTS shards (program TEXT PRIMARY KEY, file TEXT UNIQUE, created_at TEXT)")
+
+# Timestamp columns stored as integer epoch seconds; the TEXT/TIMESTAMP declarations of the older schemas are rebuilt to INTEGER
+TIME_COLUMNS = {
+    'programs': ['created_at'],
+    'domains': ['created_at', 'updated_at'],
+    'subdomains': ['created_at', 'updated_at'],
+    'subdomain_sources': ['first_seen', 'last_seen'],
+    'urls': ['created_at', 'updated_at'],
+    'cidrs': ['created_at', 'updated_at'],
+    'ip_ports': ['first_seen', 'last_seen'],
+    'ip_cves': ['first_seen', 'last_seen'],
+    'changes': ['changed_at'],
+    'shards': ['created_at'],
+}
+
+def epoch_conversion(column):
+    # SQL turning a stored local-time string into epoch seconds; anything else (epochs, unparsable text) is kept
+    return f"CASE WHEN typeof({column}) = 'text' THEN COALESCE(CAST(strftime('%s', {column}, 'utc') AS INTEGER), {column}) ELSE {column} END"
+
+def rebuild_table(table, types, conversions):
+    # SQLite cannot change a column's type: create the table again under a temporary name, copy the rows with
+    # their rowids (urls_fts is keyed on them), drop the old table, rename the copy and restore its indexes and triggers
+    sql = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    # AUTOINCREMENT never hands out a number twice, not even those of deleted rows: its counter is carried over
+    sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone() if 'AUTOINCREMENT' in sql.upper() else None
+    dependents = [row[0] for row in cursor.execute("SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+                                                   (table,))]
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+
+    sql = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {table}_rebuild", sql)
+    for column, type_name in types.items():
+        sql = re.sub(rf'\b{column}\s+\w+', f"{column} {type_name}", sql, count=1)
+    cursor.execute(sql)
+    cursor.execute(f"INSERT INTO {table}_rebuild (rowid, {', '.join(columns)}) SELECT rowid, {', '.join(conversions.get(col, col) for col in columns)} FROM {table}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_rebuild RENAME TO {table}")
+    for sql in dependents:
+        cursor.execute(sql)
+    if sequence:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+        cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, sequence[0]))
+
+def migrate_v13():
+    # "%Y-%m-%d %H:%M:%S" local-time strings become integer epochs, so time filters are integer range scans on the
+    # indexes. Triggers on other tables still name the dropped table while its copy is renamed, which only the
+    # legacy rename accepts
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    for table, columns in TIME_COLUMNS.items():
+        rebuild_table(table, {column: 'INTEGER' for column in columns}, {column: epoch_conversion(column) for column in columns})
+    cursor.execute("PRAGMA legacy_alter_table = OFF")
+
+# Per-day growth rollup: new domains, subdomains, urls and IPs per (program, day, domain), kept by insert triggers so a
+# timeline reads a few rows per day instead of grouping the whole tables. IPs have no domain and are counted under ''
+GROWTH_COLUMNS = {'domains': 'domains', 'subdomains': 'subdomains', 'urls': 'urls', 'cidrs': 'ips'}
+
+def growth_trigger(table):
+    column = GROWTH_COLUMNS[table]
+    domain = "''" if table == 'cidrs' else "NEW.domain"
+    return f"""CREATE TRIGGER growth_{table}_insert AFTER INSERT ON {table} WHEN NEW.created_at IS NOT NULL BEGIN
+        INSERT INTO daily_growth (program, day, domain, {column}) VALUES (NEW.program, date(NEW.created_at, 'unixepoch', 'localtime'), {domain}, 1)
+        ON CONFLICT(program, day, domain) DO UPDATE SET {column} = {column} + 1;
+    END"""
+
+def migrate_v14():
+    cursor.execute("""CREATE TABLE IF NOT EXISTS daily_growth (program TEXT, day TEXT, domain TEXT, domains INTEGER DEFAULT 0, subdomains INTEGER DEFAULT 0,
+                      urls INTEGER DEFAULT 0, ips INTEGER DEFAULT 0, PRIMARY KEY(program, day, domain))""")
+
+    # Backfill from what is already stored, one grouped pass per table
+    for table, column in GROWTH_COLUMNS.items():
+        domain = "''" if table == 'cidrs' else "domain"
+        cursor.execute(f"""INSERT INTO daily_growth (program, day, domain, {column})
+                          SELECT program, date(created_at, 'unixepoch', 'localtime') AS day, {domain}, COUNT(*) FROM {table}
+                          WHERE created_at IS NOT NULL GROUP BY program, day, {domain}
+                          ON CONFLICT(program, day, domain) DO UPDATE SET {column} = {column} + excluded.{column}""")
+        cursor.execute(f"DROP TRIGGER IF EXISTS growth_{table}_insert")
+        cursor.execute(growth_trigger(table))
+
+def migrate_v15():
+    # The change log consumers read is the catalogue's, with one sequence for every program. A shard's own changes
+    # table only holds what its triggers logged until collect_changes() copies it over; changes_seq is the last
+    # shard-local seq copied. Shards from before start at 0, so their history is handed over on first use
+    cursor.execute("ALTER TABLE shards ADD COLUMN changes_seq INTEGER DEFAULT 0")
+
+def migrate_v16():
+    # The change log and the shard catalogue joined TIME_COLUMNS after v13: databases that ran v13 before are rebuilt
+    # here, and the change triggers stamp epochs instead of local-time text
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    for table in ['changes', 'shards']:
+        types = {row[1]: row[2] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        columns = [column for column in TIME_COLUMNS[table] if types[column] != 'INTEGER']
+        if columns:
+            rebuild_table(table, {column: 'INTEGER' for column in columns}, {column: epoch_conversion(column) for column in columns})
+    cursor.execute("PRAGMA legacy_alter_table = OFF")
+    for table in CHANGE_COLUMNS:
+        for name, sql in change_triggers(table).items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(sql)
+
+def migrate_v17():
+    # Source triggers that skip lists already up to date, so adding a subdomain with its sources logs a single insert
+    for name in ['sources_insert', 'sources_delete']:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(SOURCE_TRIGGERS[name])
+
+# Schema migrations in order; PRAGMA user_version records how many of them a database has applied
+MIGRATIONS = [migrate_v1, migrate_v2, migrate_v3, migrate_v4, migrate_v5, migrate_v6, migrate_v7, migrate_v8, migrate_v9, migrate_v10,
+              migrate_v11, migrate_v12, migrate_v13, migrate_v14, migrate_v15, migrate_v16, migrate_v17]
+
+def migrate():
+    version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        # Each migration runs in its own transaction together with its version bump
+        cursor.execute("BEGIN")
+        try:
+            migration()
+            cursor.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except sqlite3.DatabaseError:
+            conn.rollback()
+            raise
+
+def open_database(profile=None, cached_statements=128, path=DB_PATH):
+    global conn, cursor
+    conn = connect(path, profile=profile or os.environ.get('SUBSCOPE_PROFILE', 'default'), cached_statements=cached_statements)
+    cursor = conn.cursor()
+    migrate()  # A single PRAGMA read once the database is on the latest schema version
+
+# Tables a program's rows live in, parents first, and the counters the triggers rebuild when rows are copied in
+SHARD_TABLES = ['programs', 'domains', 'subdomains', 'subdomain_sources', 'urls', 'url_tech', 'cidrs', 'ip_ports', 'ip_cves']
+SHARD_COUNTERS = {
+    'programs': ['domains', 'subdomains', 'urls', 'ips'],
+    'domains': ['subdomains', 'urls'],
+    'subdomains': ['urls'],
+}
+
+def shard_paths(connection=None):
+    # Sharded programs and their database files, from the catalogue of the given (or the module) connection
+    try:
+        rows = (connection or conn).execute("SELECT program, file FROM shards ORDER BY program").fetchall()
+    except sqlite3.OperationalError:
+        return {}  # Catalogue not created yet: a dashboard opened before the CLI migrated the database
+    return {program: os.path.join(SHARD_DIR, file) for program, file in rows}
+
+def database_file():
+    # Absolute file of the module connection's main database, whatever the working directory
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+def attach_shards(connection, paths):
+    # Attach the shards and shadow each table with a TEMP VIEW over main and every shard: TEMP objects win name
+    # lookup, so the unqualified table names in the read queries see all programs, and WHERE terms reach each leg
+    schemas = ['main']
+    for number, path in enumerate(paths):
+        connection.execute(f"ATTACH DATABASE ? AS shard_{number}", (path,))
+        schemas.append(f"shard_{number}")
+    for table in SHARD_TABLES + ['daily_growth']:
+        columns = ', '.join(row[1] for row in connection.execute(f"PRAGMA main.table_info({table})"))
+        legs = " UNION ALL ".join(f"SELECT {columns} FROM {schema}.{table}" for schema in schemas)
+        connection.execute(f"CREATE TEMP VIEW {table} AS {legs}")
+
+def move_program(program, source_path, target_path, shard_file=None):
+    # Copy every row of a program from source_path into target_path, then delete it from source_path, in one
+    # transaction that also updates the catalogue: registering shard_file when moving out of the catalogue
+    # database, dropping the entry when moving back. The target's triggers rebuild counters, caches and the FTS index.
+    # The program's change history stays in the catalogue's log under its original seq numbers
+    global conn, cursor
+    saved = conn, cursor
+    open_database(path=source_path)  # A shard left on an older schema is upgraded before its rows are copied
+    conn.close()
+    open_database(path=target_path)
+    counts = {}
+    try:
+        conn.execute("ATTACH DATABASE ? AS source", (source_path,))
+        try:
+            if not shard_file:
+                # Moving back into the catalogue: first hand over what the shard logged and has not handed over yet
+                cursor.execute("INSERT INTO main.changes (changed_at, op, entity, program, key, fields) "
+                               "SELECT changed_at, op, entity, program, key, fields FROM source.changes "
+                               "WHERE seq > (SELECT changes_seq FROM main.shards WHERE program = ?) ORDER BY seq", (program,))
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM main.changes").fetchone()[0]
+            source_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM source.changes").fetchone()[0]
+
+            for table in SHARD_TABLES:
+                source_columns = {row[1] for row in conn.execute(f"PRAGMA source.table_info({table})")}
+                columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})") if row[1] in source_columns]
+                values = ['0' if column in SHARD_COUNTERS.get(table, []) else column for column in columns]
+                cursor.execute(f"INSERT INTO main.{table} ({', '.join(columns)}) SELECT {', '.join(values)} FROM source.{table} WHERE program = ?",
+                               (program,))
+                counts[table] = cursor.rowcount
+
+            # A move changes nothing: forget the inserts the copy logged (and below, the deletes of the source rows)
+            cursor.execute("DELETE FROM main.changes WHERE seq > ?", (seq,))
+
+            # The growth rollup moves with the program: the copy's insert triggers only recount the rows still stored,
+            # the rollup also remembers the ones deleted since
+            cursor.execute("DELETE FROM main.daily_growth WHERE program = ?", (program,))
+            cursor.execute("INSERT INTO main.daily_growth (program, day, domain, domains, subdomains, urls, ips) "
+                           "SELECT program, day, domain, domains, subdomains, urls, ips FROM source.daily_growth WHERE program = ?", (program,))
+
+            # Child rows of the source go with its cascade triggers
+            for table in ['cidrs', 'urls', 'subdomains', 'domains', 'programs']:
+                cursor.execute(f"DELETE FROM source.{table} WHERE program = ?", (program,))
+            cursor.execute("DELETE FROM source.changes WHERE seq > ? AND program = ?", (source_seq, program))
+            cursor.execute("DELETE FROM source.daily_growth WHERE program = ?", (program,))
+
+            if shard_file:
+                cursor.execute("INSERT INTO source.shards (program, file, created_at) VALUES (?, ?, ?)", (program, shard_file, to_epoch(datetime.now())))
+            else:
+                cursor.execute("DELETE FROM main.shards WHERE program = ?", (program,))
+            conn.commit()
+        except sqlite3.DatabaseError:
+            conn.rollback()
+            raise
+        return counts
+    finally:
+        conn.close()
+        conn, cursor = saved
+
+def collect_changes(program, shard):
+    # Copy what commands logged in a program's shard file into the catalogue's change log, where the rows get their
+    # place in the one sequence `changes --since` pages through. `shard` is a connection to the file with the
+    # catalogue attached as `catalogue`
+    drained = cursor.execute("SELECT changes_seq FROM shards WHERE program = ?", (program,)).fetchone()[0]
+    last = shard.execute("SELECT COALESCE(MAX(seq), 0) FROM main.changes").fetchone()[0]
+    if last > drained:
+        # Claim the rows by advancing the marker first, so two processes never copy the same rows
+        cursor.execute("UPDATE shards SET changes_seq = ? WHERE program = ? AND changes_seq = ?", (last, program, drained))
+        if cursor.rowcount:
+            cursor.executemany("INSERT INTO changes (changed_at, op, entity, program, key, fields) VALUES (?, ?, ?, ?, ?, ?)",
+                               shard.execute("SELECT changed_at, op, entity, program, key, fields FROM main.changes WHERE seq > ? AND seq <= ? "
+                                             "ORDER BY seq", (drained, last)))
+        conn.commit()
+
+    # Rows the catalogue has committed are not needed in the shard any more
+    shard.execute("DELETE FROM main.changes WHERE seq <= (SELECT changes_seq FROM catalogue.shards WHERE program = ?)", (program,))
+    shard.commit()
+
+def open_shards(shards, profile=None):
+    # A connection and cursor per shard file, for a command that writes each record of its input to the file of the
+    # record's program in one pass. The catalogue is attached to each for collect_changes()
+    global conn, cursor
+    saved = conn, cursor
+    catalogue = database_file()
+    databases = {}
+    try:
+        for program, path in shards.items():
+            open_database(profile, path=path)
+            databases[program] = conn, cursor
+            conn.execute("ATTACH DATABASE ? AS catalogue", (catalogue,))
+    except Exception:
+        for shard, _ in databases.values():
+            shard.close()
+        raise
+    finally:
+        conn, cursor = saved
+    return databases
+
+def close_shards(databases):
+    # Hand what the commands logged in the shards over to the catalogue's change log, then close them
+    for program, (shard, _) in databases.items():
+        try:
+            collect_changes(program, shard)
+        finally:
+            shard.close()
+
+def select_database(database):
+    # Point the module connection and cursor the command functions share at one of several open databases
+    global conn, cursor
+    conn, cursor = database
+
+def remove_database_file(path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def add_program(program):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        # Check if the program already exists with a COUNT query for efficiency
+        cursor.execute("SELECT COUNT(1) FROM programs WHERE program = ?", (program,))
+        exists = cursor.fetchone()[0]
+
+        if exists:
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} already exists")
+            return
+
+        cursor.execute("SELECT COUNT(*) FROM domains WHERE program = ?", (program,))
+        domains_counts = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM subdomains WHERE program = ?", (program,))
+        subdomains_counts = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM urls WHERE program = ?", (program,))
+        urls_counts = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM cidrs WHERE program = ?", (program,))
+        ips_counts = cursor.fetchone()[0]
+        
+        # If the program does not exist, create a new one
+        cursor.execute("INSERT INTO programs (program, domains, subdomains, urls, ips, created_at) VALUES (?, ?, ?, ?, ?, ?)", 
+                       (program, domains_counts, subdomains_counts, urls_counts, ips_counts, to_epoch(timestamp)))
+        conn.commit()
+
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} created")
+
+    except sqlite3.DatabaseError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding program | database error: {e}")
+
+def list_programs(program='*', brief=False, count=False):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # For potential logging
+    try:
+        # Fetch programs from the database along with the counts of domains, subdomains, URLs, and IPs
+        if program == '*':
+            cursor.execute("SELECT program, domains, subdomains, urls, ips, created_at FROM programs")
+        else:
+            cursor.execute("SELECT program, domains, subdomains, urls, ips, created_at FROM programs WHERE program LIKE ?", (f"%{program}%",))
+        
+        programs = cursor.fetchall()
+
+        # If no programs exist, display a message
+        if not programs:
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} not found")
+            return
+
+        # Handle counting records
+        if count:
+            count_result = len(programs)
+            print(count_result)
+            return
+
+        # Brief mode: print only program names
+        if brief:
+            for ws in programs:
+                print(ws[0])  # Print each program name in brief mode
+        else:
+            # Detailed mode: print program with created_at, domain count, subdomain count, URL count, and IP count as JSON
+            program_list = [{'program': ws[0], 'domains': ws[1], 
+                             'subdomains': ws[2], 'urls': ws[3], 
+                             'ips': ws[4], 'created_at': format_time(ws[5])} for ws in programs]
+            print(json.dumps({"programs": program_list}, indent=4))
+
+    except sqlite3.DatabaseError as e:
+        print(f"{Fore.RED}error{Style.RESET_ALL} | listing programs | database error: {e}")
+
+def delete_program(program, delete_all=False):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def count_entries(program=None):
+            if program == '*':
+                cursor.execute("SELECT COUNT(*) FROM cidrs")
+                ip_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM urls")
+                url_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM subdomains")
+                subdomain_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM domains")
+                domain_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM programs")
+                program_count = cursor.fetchone()[0]
+            else:
+                cursor.execute("SELECT COUNT(*) FROM cidrs WHERE program = ?", (program,))
+                ip_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM urls WHERE program = ?", (program,))
+                url_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM subdomains WHERE program = ?", (program,))
+                subdomain_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM domains WHERE program = ?", (program,))
+                domain_count = cursor.fetchone()[0]
+
+                cursor.execute("SELECT COUNT(*) FROM programs WHERE program = ?", (program,))
+                program_count = 1 if cursor.fetchone() else 0
+
+            return program_count, domain_count, subdomain_count, url_count, ip_count
+
+    try:
+        shards = shard_paths()
+        if program in shards:
+            if delete_all:
+                drop_shards([program])
+            else:
+                # Its rows live only in its own file: dropping the programs row alone would leave them registered there but unreachable
+                print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} is sharded, "
+                      f"delete it together with its database file using {Fore.BLUE}{Style.BRIGHT}--all{Style.RESET_ALL}")
+            return
+
+        if program == '*':
+            if delete_all:
+                # Delete all related data for all programs
+                program_count, domain_count, subdomain_count, url_count, ip_count = count_entries('*')
+
+                cursor.execute("DELETE FROM cidrs")
+                cursor.execute("DELETE FROM urls")
+                cursor.execute("DELETE FROM subdomains")
+                cursor.execute("DELETE FROM domains")
+                cursor.execute("DELETE FROM programs")
+                cursor.execute("DELETE FROM daily_growth")
+                conn.commit()
+
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting all programs | all programs with program: {program_count}, domains: {domain_count}, subdomains: {subdomain_count}, urls: {url_count}, ips: {ip_count}")
+                drop_shards(shards)
+            else:
+                # Only delete all programs
+                cursor.execute("DELETE FROM programs")
+                conn.commit()
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting programs | deleted all programs")
+        
+        else:
+            if delete_all:
+                # Delete all related data for the specified program
+                program_count, domain_count, subdomain_count, url_count, ip_count = count_entries(program)
+
+                cursor.execute("DELETE FROM cidrs WHERE program = ?", (program,))
+                cursor.execute("DELETE FROM urls WHERE program = ?", (program,))
+                cursor.execute("DELETE FROM subdomains WHERE program = ?", (program,))
+                cursor.execute("DELETE FROM domains WHERE program = ?", (program,))
+                cursor.execute("DELETE FROM programs WHERE program = ?", (program,))
+                cursor.execute("DELETE FROM daily_growth WHERE program = ?", (program,))
+                conn.commit()
+
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting all program of {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} | program: {program_count}, domains: {domain_count}, subdomains: {subdomain_count}, urls: {url_count}, ips: {ip_count}")
+                return
+
+            cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+            if not cursor.fetchone():
+                print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} not found")
+                return
+            else:
+                cursor.execute("DELETE FROM programs WHERE program = ?", (program,))
+                conn.commit()
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} deleted")
+
+    except sqlite3.DatabaseError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting program | database error: {e}")
+
+def timeline_query(program='*', days=90, domain=None, by_domain=False):
+    # Daily growth over the last `days` days (today included) from the rollup, oldest first; shared with the dashboard
+    filters = ["day >= ?"]
+    parameters = [(datetime.now() - timedelta(days=days - 1)).strftime("%Y-%m-%d")]
+    if program != '*':
+        filters.append("program = ?")
+        parameters.append(program)
+    if domain:
+        filters.append("domain = ?")
+        parameters.append(domain)
+    group = "day, domain" if by_domain else "day"
+    query = (f"SELECT {group}, SUM(domains), SUM(subdomains), SUM(urls), SUM(ips) FROM daily_growth WHERE {' AND '.join(filters)} "
+             f"GROUP BY {group} ORDER BY {group}")
+    return query, parameters
+
+def timeline_record(row, by_domain=False):
+    record = {'day': row[0], 'domain': row[1] or None} if by_domain else {'day': row[0]}
+    counts = row[2:] if by_domain else row[1:]
+    return dict(record, domains=counts[0], subdomains=counts[1], urls=counts[2], ips=counts[3])
+
+def program_timeline(program, days=90, domain=None, by_domain=False, output_format='json'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if program != '*':
+        cursor.execute("SELECT 1 FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | program timeline | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    cursor.execute(*timeline_query(program, days, domain, by_domain))
+    to_record = lambda row: timeline_record(row, by_domain)
+    if output_format == 'ndjson':
+        write_ndjson(cursor, to_record)
+    else:
+        print(json.dumps([to_record(row) for row in cursor.fetchall()], indent=4))
+
+def shard_program(program):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if program in shard_paths():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | sharding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} already has its own database file")
+        return
+    cursor.execute("SELECT 1 FROM programs WHERE program = ?", (program,))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | sharding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} not found")
+        return
+
+    shard_file = re.sub(r'[^\w.-]', '_', program) + '.db'
+    path = os.path.join(SHARD_DIR, shard_file)
+    cursor.execute("SELECT program FROM shards WHERE file = ?", (shard_file,))
+    if cursor.fetchone() or os.path.exists(path):
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | sharding program | database file {Fore.BLUE}{Style.BRIGHT}{path}{Style.RESET_ALL} already exists")
+        return
+
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    try:
+        counts = move_program(program, database_file(), path, shard_file=shard_file)
+    except sqlite3.DatabaseError as e:
+        remove_database_file(path)
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | sharding program | database error: {e}")
+        return
+
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | sharding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} moved to "
+          f"{Fore.BLUE}{Style.BRIGHT}{path}{Style.RESET_ALL} | domains: {counts['domains']}, subdomains: {counts['subdomains']}, urls: {counts['urls']}, ips: {counts['cidrs']}")
+
+def unshard_program(program):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    path = shard_paths().get(program)
+    if not path:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | unsharding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} has no database file of its own")
+        return
+
+    try:
+        # Domains are unique across the catalogue database, so a clash with another program aborts the move
+        counts = move_program(program, path, database_file())
+    except sqlite3.DatabaseError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | unsharding program | database error: {e}")
+        return
+    remove_database_file(path)
+
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | unsharding program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} moved back from "
+          f"{Fore.BLUE}{Style.BRIGHT}{path}{Style.RESET_ALL} | domains: {counts['domains']}, subdomains: {counts['subdomains']}, urls: {counts['urls']}, ips: {counts['cidrs']}")
+
+def drop_shards(programs):
+    # Deleting a sharded program is deleting its file: no rows to scan and no pages to rewrite in the catalogue
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    paths = shard_paths()
+    for program in programs:
+        cursor.execute("DELETE FROM shards WHERE program = ?", (program,))
+        conn.commit()
+        remove_database_file(paths[program])
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting all program of {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} | "
+              f"database file {Fore.BLUE}{Style.BRIGHT}{paths[program]}{Style.RESET_ALL} removed")
+
+def is_line_input(value):
+    # `-` (stdin) or an existing file: the argument names a list of records, one per line
+    return value == '-' or os.path.isfile(value)
+
+def read_lines(path):
+    # Stream non-empty lines from a file, or stdin for `-`, instead of loading everything into memory
+    with (open(sys.stdin.fileno(), 'r', closefd=False) if path == '-' else open(path, 'r')) as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+def write_ndjson(rows, to_record):
+    # Stream a cursor as one compact JSON object per line, a batch at a time, so memory stays flat
+    # and the first rows reach the consumer while the query is still running. Returns the row count
+    written = 0
+    try:
+        batch = rows.fetchmany(FETCH_BATCH_SIZE)
+        while batch:
+            sys.stdout.write("".join(json.dumps(to_record(row), separators=(',', ':')) + "\n" for row in batch))
+            written += len(batch)
+            batch = rows.fetchmany(FETCH_BATCH_SIZE)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The consumer stopped reading (e.g. `| head`); silence the flush at interpreter exit
+        sys.stdout = open(os.devnull, 'w')
+    return written
+
+def chunked(iterable, size=INGEST_CHUNK_SIZE):
+    # Group an iterable into lists of at most `size` items
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Program archives: gzip'd NDJSON with a header line, then one JSON array per row ([table, values...]) in parent-first
+# order, and ["delete", entity, key] lines for incremental exports. Counters, caches and lookup keys are not
+# exported; the importer rebuilds them (the triggers refill counters and the port/cves/source display columns)
+ARCHIVE_VERSION = 2  # 2: timestamps are epoch seconds (version 1 archives carry local time strings)
+
+ARCHIVE_TABLES = {
+    'programs': ['program', 'created_at'],
+    'domains': ['domain', 'program', 'scope', 'created_at', 'updated_at'],
+    'subdomains': ['subdomain', 'domain', 'program', 'scope', 'resolved', 'ip_address', 'cdn_status', 'cdn_name', 'created_at', 'updated_at'],
+    'subdomain_sources': ['subdomain', 'domain', 'program', 'source', 'first_seen', 'last_seen'],
+    'urls': ['url', 'subdomain', 'domain', 'program', 'scheme', 'method', 'port', 'path', 'flag', 'status_code', 'scope', 'content_length',
+             'ip_address', 'cdn_status', 'cdn_name', 'title', 'webserver', 'webtech', 'cname', 'location', 'created_at', 'updated_at'],
+    'cidrs': ['ip', 'program', 'cidr', 'asn', 'service', 'created_at', 'updated_at'],
+    'ip_ports': ['ip', 'program', 'port', 'service', 'first_seen', 'last_seen'],
+    'ip_cves': ['ip', 'program', 'cve', 'first_seen', 'last_seen'],
+}
+
+# Conflict target and "newer wins" timestamp of each archived table
+ARCHIVE_KEYS = {
+    'programs': (['program'], None),
+    'domains': (['domain'], 'updated_at'),
+    'subdomains': (['subdomain', 'domain', 'program'], 'updated_at'),
+    'subdomain_sources': (['subdomain', 'domain', 'program', 'source'], 'last_seen'),
+    'urls': (['url', 'subdomain', 'domain', 'program'], 'updated_at'),
+    'cidrs': (['ip', 'program'], 'updated_at'),
+    'ip_ports': (['ip', 'program', 'port'], 'last_seen'),
+    'ip_cves': (['ip', 'program', 'cve'], 'last_seen'),
+}
+
+# Columns only written on insert: starting counters and caches, and keys derived from the row
+ARCHIVE_DERIVED = {
+    'programs': {'domains': 0, 'subdomains': 0, 'urls': 0, 'ips': 0},
+    'domains': {'subdomains': 0, 'urls': 0},
+    'subdomains': {'source': '', 'urls': 0, 'rev_host': lambda row: rev_host(row['subdomain'])},
+    'urls': {'rev_host': lambda row: rev_host(row['subdomain'])},
+    'cidrs': {'port': 'none', 'cves': 'none', 'ip_key': lambda row: ip_key(row['ip'])},
+}
+
+def archive_upsert_sql(table, columns):
+    keys, stamp = ARCHIVE_KEYS[table]
+    derived = list(ARCHIVE_DERIVED.get(table, {}))
+    query = f"INSERT INTO {table} ({', '.join(columns + derived)}) VALUES ({', '.join('?' for _ in columns + derived)}) ON CONFLICT({', '.join(keys)}) "
+    if stamp is None:
+        return query + "DO NOTHING"
+    updates = [f"{col} = MIN({col}, excluded.{col})" if col in ('created_at', 'first_seen') else f"{col} = excluded.{col}"
+               for col in columns if col not in keys]
+    # Newer rows win; a domain registered under another program is left alone
+    condition = f"excluded.{stamp} > {table}.{stamp}" + (" AND excluded.program = domains.program" if table == 'domains' else "")
+    return query + f"DO UPDATE SET {', '.join(updates)} WHERE {condition}"
+
+def archive_file(program):
+    return f"{program}.ndjson.gz"
+
+def export_program(program, output=None, since=None):
+    import gzip
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    to_stdout = output == '-'
+    log = sys.stderr if to_stdout else sys.stdout
+
+    cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | exporting program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist", file=log)
+        return
+
+    since_time = parse_single_time(since)[0] if since else None
+    output = output or archive_file(program)
+    counts = {}
+
+    def dump(line):
+        return json.dumps(line, separators=(',', ':')) + "\n"
+
+    try:
+        with gzip.open(sys.stdout.buffer if to_stdout else output, 'wt', encoding='utf-8', compresslevel=6) as archive:
+            archive.write(dump({'format': 'subscope-archive', 'version': ARCHIVE_VERSION, 'program': program, 'since': to_epoch(since_time),
+                                'exported_at': timestamp, 'columns': ARCHIVE_TABLES}))
+
+            # An incremental export first replays the deletes recorded in the change log, an index range on changed_at
+            if since_time:
+                rows = conn.execute("SELECT entity, key FROM changes WHERE op = 'delete' AND program = ? AND changed_at >= ?",
+                                    (program, to_epoch(since_time)))
+                for batch in chunked(rows, FETCH_BATCH_SIZE):
+                    archive.write("".join(dump(['delete', entity, key]) for entity, key in batch))
+                    counts['delete'] = counts.get('delete', 0) + len(batch)
+
+            for table, columns in ARCHIVE_TABLES.items():
+                stamp = ARCHIVE_KEYS[table][1]
+                query = f"SELECT {', '.join(columns)} FROM {table} WHERE program = ?"
+                parameters = [program]
+                if since_time and stamp:
+                    query += f" AND {stamp} >= ?"
+                    parameters.append(to_epoch(since_time))
+                rows = conn.execute(query, parameters)
+                batch = rows.fetchmany(FETCH_BATCH_SIZE)
+                while batch:
+                    archive.write("".join(dump([table, *row]) for row in batch))
+                    counts[table] = counts.get(table, 0) + len(batch)
+                    batch = rows.fetchmany(FETCH_BATCH_SIZE)
+    except BrokenPipeError:
+        sys.stdout = open(os.devnull, 'w')
+        return
+    except OSError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | exporting program | {e}", file=log)
+        return
+
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | exporting program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} "
+          f"written to {Fore.BLUE}{Style.BRIGHT}{'stdout' if to_stdout else output}{Style.RESET_ALL}: {summary}", file=log)
+
+def import_program(file_path, program=None):
+    import gzip
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if file_path != '-' and not os.path.isfile(file_path):
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing program | file {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL} does not exist")
+        return
+
+    counts = {}
+    written = 0
+    try:
+        with gzip.open(sys.stdin.buffer if file_path == '-' else file_path, 'rt', encoding='utf-8') as archive:
+            header = json.loads(archive.readline() or 'null')
+            if not isinstance(header, dict) or header.get('format') != 'subscope-archive' or header.get('version', 0) > ARCHIVE_VERSION:
+                print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing program | {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL} is not a supported program archive")
+                return
+            program = program or header['program']
+
+            # Columns are matched by name, so archives from other schema versions import what both sides know
+            layouts = {}
+            for table, archived in header['columns'].items():
+                if table in ARCHIVE_TABLES:
+                    columns = [col for col in ARCHIVE_TABLES[table] if col in archived]
+                    layouts[table] = (columns, [archived.index(col) for col in columns], archive_upsert_sql(table, columns))
+
+            def flush(table, batch):
+                nonlocal written
+                if table == 'delete':
+                    # The same program-scoped key deletes the change log recorded; triggers cascade to child tables
+                    tables = {entity: (name, key) for name, (entity, key, _) in CHANGE_COLUMNS.items()}
+                    for entity, key in batch:
+                        name, key_column = tables[entity]
+                        cursor.execute(f"DELETE FROM {name} WHERE {key_column} = ? AND program = ?", (key, program))
+                        written += cursor.rowcount
+                    return
+                columns, positions, query = layouts[table]
+                derived = ARCHIVE_DERIVED.get(table, {})
+                rows = []
+                for values in batch:
+                    row = {col: values[position] for col, position in zip(columns, positions)}
+                    row['program'] = program
+                    for col in TIME_COLUMNS.get(table, []):
+                        if col in row:
+                            row[col] = to_epoch(row[col])
+                    rows.append([row[col] for col in columns] + [value(row) if callable(value) else value for value in derived.values()])
+                cursor.executemany(query, rows)
+                written += cursor.rowcount
+                if table == 'urls' and 'webtech' in columns:
+                    # Re-read the stored rows so url_tech follows whichever side won the upsert
+                    urls = list({row[0] for row in rows})
+                    stored = conn.execute(f"SELECT url, subdomain, domain, program, webtech FROM urls WHERE program = ? AND url IN ({', '.join('?' for _ in urls)})",
+                                          [program] + urls).fetchall()
+                    sync_url_tech(stored)
+
+            # Consecutive lines of one table go in as one batched upsert, committed per chunk
+            table, batch = None, []
+            for line in archive:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind, values = record[0], record[1:]
+                if kind != 'delete' and kind not in layouts:
+                    continue
+                if kind != table or len(batch) >= INGEST_CHUNK_SIZE:
+                    if batch:
+                        flush(table, batch)
+                        conn.commit()
+                    table, batch = kind, []
+                batch.append(values)
+                counts[kind] = counts.get(kind, 0) + 1
+            if batch:
+                flush(table, batch)
+                conn.commit()
+
+    except (OSError, EOFError, ValueError, KeyError, IndexError) as e:
+        conn.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing program | {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL} is damaged: {e}")
+        return
+    except sqlite3.DatabaseError as e:
+        conn.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing program | database error: {e}")
+        return
+
+    summary = ", ".join(f"{count} {table}" for table, count in counts.items())
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | importing program | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} "
+          f"from {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL}: {summary} read, {Fore.BLUE}{Style.BRIGHT}{written}{Style.RESET_ALL} rows added, updated or deleted")
+
+def ingest_domains(domains, program, scope=None, timestamp=None, report=False, commit_chunks=False):
+    # Upsert domains chunk by chunk; the caller owns the transaction unless commit_chunks asks for one per chunk
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'conflicts': 0}
+    epoch = to_epoch(timestamp)
+
+    for chunk in chunked(domains):
+        chunk = list(dict.fromkeys(chunk))  # Drop duplicates inside the chunk, keep input order
+        placeholders = ", ".join("?" for _ in chunk)
+
+        # One lookup per chunk instead of one SELECT per line
+        cursor.execute(f"SELECT domain, program, scope FROM domains WHERE domain IN ({placeholders})", chunk)
+        existing = {row[0]: row for row in cursor.fetchall()}
+        cursor.execute(f"SELECT domain, COUNT(*) FROM subdomains WHERE domain IN ({placeholders}) GROUP BY domain", chunk)
+        subdomains_counts = dict(cursor.fetchall())
+        cursor.execute(f"SELECT domain, COUNT(*) FROM urls WHERE domain IN ({placeholders}) GROUP BY domain", chunk)
+        urls_counts = dict(cursor.fetchall())
+
+        rows = []
+        for domain in chunk:
+            current = existing.get(domain)
+
+            if current is None:
+                new_scope = scope if scope is not None else 'inscope'
+                rows.append((domain, program, new_scope, subdomains_counts.get(domain, 0), urls_counts.get(domain, 0), epoch, epoch))
+                stats['added'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding domain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} added to program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}")
+
+            elif current[1] != program:
+                # The domain is the primary key, so it can only belong to one program
+                stats['conflicts'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding domain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} already belongs to program {Fore.BLUE}{Style.BRIGHT}{current[1]}{Style.RESET_ALL}")
+
+            # Only update the scope if a new scope is provided
+            elif scope is not None and current[2] != scope:
+                rows.append((domain, program, scope, 0, 0, epoch, epoch))
+                stats['updated'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | updating domain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} updated to {scope}")
+
+            else:
+                stats['unchanged'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.YELLOW}notice{Style.RESET_ALL} | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} unchanged")
+
+        cursor.executemany("""
+            INSERT INTO domains (domain, program, scope, subdomains, urls, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(domain) DO UPDATE SET scope = excluded.scope, updated_at = excluded.updated_at""", rows)
+        if commit_chunks:
+            conn.commit()
+
+    return stats
+
+def add_domain(domain_or_file, program, scope=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Check if the program exists
+    cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding domain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+        return
+
+    # A file or `-` (stdin) holds one domain per line
+    from_file = is_line_input(domain_or_file)
+    domains = read_lines(domain_or_file) if from_file else [domain_or_file]
+
+    try:
+        # Streamed input is committed chunk by chunk, so memory and the WAL stay bounded however long it is
+        stats = ingest_domains(domains, program, scope=scope, timestamp=timestamp, report=not from_file, commit_chunks=from_file)
+        conn.commit()
+    except sqlite3.DatabaseError as e:
+        conn.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding domain | database error: {e}")
+        return
+
+    if from_file:
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding domain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}: "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['added']}{Style.RESET_ALL} added, {Fore.BLUE}{Style.BRIGHT}{stats['updated']}{Style.RESET_ALL} updated, "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['unchanged']}{Style.RESET_ALL} unchanged, {Fore.BLUE}{Style.BRIGHT}{stats['conflicts']}{Style.RESET_ALL} owned by another program")
+
+# --match modes of the list and delete commands: list commands default to contains, delete commands to exact
+MATCH_MODES = ['contains', 'exact', 'prefix', 'suffix', 'glob', 'regex']
+
+# Hostname columns that have a reversed-label rev_host key next to them
+HOST_COLUMNS = {'subdomain'}
+
+def glob_escape(value):
+    return re.sub(r'([*?\[])', r'[\1]', value)
+
+def match_clause(column, value, mode='contains'):
+    # One filter value as (SQL, parameters), in a form the column's index can serve wherever the mode allows it
+    value = str(value)
+    if mode == 'exact':
+        return f"{column} = ?", [value]
+    if mode == 'prefix':
+        # Unlike LIKE, a GLOB with a literal prefix is an index range scan on a BINARY column
+        return f"{column} GLOB ?", [glob_escape(value) + '*']
+    if mode == 'suffix':
+        if column in HOST_COLUMNS:
+            # Hostname suffixes are whole labels: the host itself and everything below it
+            prefix = rev_host(value)
+            return "rev_host >= ? AND rev_host < ?", [prefix, prefix[:-1] + '/']
+        return f"{column} GLOB ?", ['*' + glob_escape(value)]
+    if mode == 'regex':
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise ValueError(f"Invalid regular expression {value}: {e}")
+        return f"{column} REGEXP ?", [value]
+    if column in HOST_COLUMNS and host_suffix_filter(value):
+        return host_suffix_filter(value)
+    if mode == 'glob':
+        return f"{column} GLOB ?", [value]
+    return f"{column} LIKE ?", [f"%{value}%"]
+
+def compile_filters(matches, match='contains', clauses=()):
+    # Turn CLI filters into one parameterized WHERE clause, shared by a command's listing, --count, --stats-* and delete.
+    # `matches` are (column, value, mode) triples; mode None follows --match, and values of None or '*' are no filter.
+    # `clauses` are (SQL, parameters) pairs already compiled against their own index (sources, ports, CVEs, time ranges...)
+    conditions = []
+    parameters = []
+    for column, value, mode in matches:
+        if value is None or value == '' or value == '*':
+            continue
+        condition, values = match_clause(column, value, mode or match)
+        conditions.append(condition)
+        parameters.extend(values)
+    for condition, values in clauses:
+        conditions.append(condition)
+        parameters.extend(values)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), parameters
+
+def to_epoch(value):
+    # Local "%Y-%m-%d %H:%M:%S" strings and datetimes as stored epoch seconds; epochs pass through
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return int(value.timestamp()) if isinstance(value, datetime) else value
+
+def format_time(value):
+    # Stored epochs are shown in local time, in the format the timestamps have always been printed in
+    return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, int) else value
+
+# --stats-bucket sizes for the created/updated time statistics, grouped in SQL on local time
+TIME_BUCKETS = {
+    'second': "strftime('%Y-%m-%d %H:%M:%S', {column}, 'unixepoch', 'localtime')",
+    'minute': "strftime('%Y-%m-%d %H:%M', {column}, 'unixepoch', 'localtime')",
+    'hour': "strftime('%Y-%m-%d %H:00', {column}, 'unixepoch', 'localtime')",
+    'day': "date({column}, 'unixepoch', 'localtime')",
+    'week': "date({column}, 'unixepoch', 'localtime', '-6 days', 'weekday 1')",  # Monday starting the week
+}
+
+def time_clauses(create_time=None, update_time=None):
+    clauses = []
+    if create_time:
+        clauses.append(("created_at BETWEEN ? AND ?", [to_epoch(value) for value in parse_time_range(create_time)]))
+    if update_time:
+        clauses.append(("updated_at BETWEEN ? AND ?", [to_epoch(value) for value in parse_time_range(update_time)]))
+    return clauses
+
+def domain_record(domain):
+    return {
+        'domain': domain[0],
+        'program': domain[1],
+        'scope': domain[2],
+        'subdomains': domain[3],
+        'urls': domain[4],
+        'created_at': format_time(domain[5]),
+        'updated_at': format_time(domain[6])
+    }
+
+def list_domains(domain='*', program='*', brief=False, count=False, scope=None, output_format='json', match='contains'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # For potential logging
+
+    # Check if the program is specific or all
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing domain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    try:
+        where, params = compile_filters([('program', program, 'exact'), ('domain', domain, None), ('scope', scope, 'exact')], match)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing domain | {e}")
+        return
+
+    if count:
+        cursor.execute("SELECT COUNT(*) FROM domains" + where, params)
+        print(cursor.fetchone()[0])
+        return
+
+    cursor.execute("SELECT domain, program, scope, subdomains, urls, created_at, updated_at FROM domains" + where, params)
+
+    if output_format == 'ndjson' and not brief:
+        if not write_ndjson(cursor, domain_record):
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing domain | no domains found")
+        return
+
+    domains = cursor.fetchall()
+
+    if not domains:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing domain | no domains found")
+        return
+
+    if brief:
+        for domain in domains:
+            print(domain[0])
+    else:
+        domain_list = [domain_record(domain) for domain in domains]
+        print(json.dumps({"domains": domain_list}, indent=4))
+
+def delete_domain(domain='*', program='*', scope=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # For potential logging
+
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting domain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    if domain == '*':
+        # Deleting all records
+        counts = {
+            'urls': cursor.execute("SELECT COUNT(*) FROM urls").fetchone()[0],
+            'subdomains': cursor.execute("SELECT COUNT(*) FROM subdomains").fetchone()[0],
+            'domains': cursor.execute("SELECT COUNT(*) FROM domains").fetchone()[0]
+        }
+
+        # Delete records based on scope or all if scope is None
+        if scope is None:
+            cursor.execute("DELETE FROM urls")
+            cursor.execute("DELETE FROM subdomains")
+            cursor.execute("DELETE FROM domains")
+        else:
+            cursor.execute("DELETE FROM urls WHERE scope = ?", (scope,))
+            cursor.execute("DELETE FROM subdomains WHERE scope = ?", (scope,))
+            cursor.execute("DELETE FROM domains WHERE scope = ?", (scope,))
+
+        conn.commit()
+
+        if counts['domains'] == 0:
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting domain | domain table is empty")
+        else:
+            print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting domain | deleted {Fore.BLUE}{Style.BRIGHT}{counts['domains']}{Style.RESET_ALL} domains, {Fore.BLUE}{Style.BRIGHT}{counts['subdomains']}{Style.RESET_ALL} subdomains and {Fore.BLUE}{Style.BRIGHT}{counts['urls']}{Style.RESET_ALL} urls")
+    else:
+        if program == '*':
+            # Deleting records across all programs
+            counts = {
+                'urls': cursor.execute("SELECT COUNT(domain) FROM urls WHERE domain = ?", (domain,)).fetchone()[0],
+                'subdomains': cursor.execute("SELECT COUNT(domain) FROM subdomains WHERE domain = ?", (domain,)).fetchone()[0],
+                'domains': cursor.execute("SELECT COUNT(domain) FROM domains WHERE domain = ?", (domain,)).fetchone()[0]
+            }
+
+            # Delete based on scope or all if scope is None
+            if scope is None:
+                cursor.execute("DELETE FROM subdomains WHERE domain = ?", (domain,))
+                cursor.execute("DELETE FROM urls WHERE domain = ?", (domain,))
+                cursor.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+            else:
+                cursor.execute("DELETE FROM subdomains WHERE domain = ? AND scope = ?", (domain, scope))
+                cursor.execute("DELETE FROM urls WHERE domain = ? AND scope = ?", (domain, scope))
+                cursor.execute("DELETE FROM domains WHERE domain = ? AND scope = ?", (domain, scope))
+
+            conn.commit()
+            
+            if counts['domains'] == 0:
+                print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting domain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} does not exist")
+            else:
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting domain | deleted {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} with {Fore.BLUE}{Style.BRIGHT}{counts['subdomains']}{Style.RESET_ALL} subdomains and {Fore.BLUE}{Style.BRIGHT}{counts['urls']}{Style.RESET_ALL} urls")
+        else:
+            # Deleting records in a specific program
+            counts = {
+                'urls': cursor.execute("SELECT COUNT(domain) FROM urls WHERE domain = ? AND program = ?", (domain, program)).fetchone()[0],
+                'subdomains': cursor.execute("SELECT COUNT(domain) FROM subdomains WHERE domain = ? AND program = ?", (domain, program)).fetchone()[0],
+                'domains': cursor.execute("SELECT COUNT(domain) FROM domains WHERE domain = ? AND program = ?", (domain, program)).fetchone()[0]
+            }
+
+            # Delete based on scope or all if scope is None
+            if scope is None:
+                cursor.execute("DELETE FROM subdomains WHERE domain = ? AND program = ?", (domain, program))
+                cursor.execute("DELETE FROM domains WHERE domain = ? AND program = ?", (domain, program))
+            else:
+                cursor.execute("DELETE FROM subdomains WHERE domain = ? AND program = ? AND scope = ?", (domain, program, scope))
+                cursor.execute("DELETE FROM domains WHERE domain = ? AND program = ? AND scope = ?", (domain, program, scope))
+
+            conn.commit()
+
+            if counts['domains'] == 0:
+                print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting domain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} does not exist")
+            else:
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting domain | deleted {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} from {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with {Fore.BLUE}{Style.BRIGHT}{counts['subdomains']}{Style.RESET_ALL} subdomains and {Fore.BLUE}{Style.BRIGHT}{counts['urls']}{Style.RESET_ALL} urls")
+
+def merge_subdomain_fields(existing, scope=None, resolved=None, ip_address=None, cdn_status=None, cdn_name=None,
+                           unip=None, uncdn_name=None):
+    # existing is (scope, resolved, ip_address, cdn_status, cdn_name); returns the columns that change
+    current_scope, current_resolved, current_ip, current_cdn_status, current_cdn_name = existing
+    update_fields = {}
+
+    if scope is not None and scope != current_scope:
+        update_fields['scope'] = scope
+
+    # Only update resolved if it's specified
+    if resolved is not None and resolved != current_resolved:
+        update_fields['resolved'] = resolved
+
+    if ip_address is not None and ip_address != current_ip:
+        update_fields['ip_address'] = ip_address
+
+    if unip and current_ip != 'none':  # If unip is set and ip_address is not 'none'
+        update_fields['ip_address'] = 'none'
+
+    if cdn_status is not None and cdn_status != current_cdn_status:
+        update_fields['cdn_status'] = cdn_status
+
+    if uncdn_name and current_cdn_name != 'none':
+        update_fields['cdn_name'] = 'none'
+
+    if cdn_name is not None and cdn_name != current_cdn_name:
+        update_fields['cdn_name'] = cdn_name
+
+    return update_fields
+
+def split_sources(values):
+    # --source/--unsource accept space and comma separated names
+    return list(dict.fromkeys(src.strip() for value in values or [] for src in value.split(',') if src.strip()))
+
+def ingest_subdomains(subdomains, domain, program, sources=None, unsources=None, scope=None, resolved=None,
+                      ip_address=None, cdn_status=None, cdn_name=None, unip=None, uncdn_name=None, timestamp=None, report=False,
+                      commit_chunks=False):
+    # Upsert subdomains chunk by chunk; the caller owns the transaction unless commit_chunks asks for one per chunk
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0}
+    epoch = to_epoch(timestamp)
+    merge_columns = ('scope', 'resolved', 'ip_address', 'cdn_status', 'cdn_name')
+    sources = split_sources(sources)
+    unsources = split_sources(unsources)
+    new_sources = ", ".join(sorted(set(sources) - set(unsources)))  # The source list of a subdomain added now
+
+    for chunk in chunked(subdomains):
+        chunk = list(dict.fromkeys(chunk))  # Drop duplicates inside the chunk, keep input order
+        placeholders = ", ".join("?" for _ in chunk)
+
+        # One lookup per chunk instead of two SELECTs per line
+        cursor.execute(f"SELECT subdomain, {', '.join(merge_columns)} FROM subdomains WHERE domain = ? AND program = ? AND subdomain IN ({placeholders})",
+                       (domain, program, *chunk))
+        existing = {row[0]: row[1:] for row in cursor.fetchall()}
+        cursor.execute(f"SELECT subdomain, COUNT(*) FROM urls WHERE program = ? AND domain = ? AND subdomain IN ({placeholders}) GROUP BY subdomain",
+                       (program, domain, *chunk))
+        urls_counts = dict(cursor.fetchall())
+        existing_sources = {}
+        if sources or unsources:
+            cursor.execute(f"SELECT subdomain, source FROM subdomain_sources WHERE domain = ? AND program = ? AND subdomain IN ({placeholders})",
+                           (domain, program, *chunk))
+            for subdomain, source in cursor.fetchall():
+                existing_sources.setdefault(subdomain, set()).add(source)
+
+        rows = []
+        removed_sources = []
+        for subdomain in chunk:
+            current = existing.get(subdomain)
+
+            if current is None:
+                rows.append((subdomain, domain, program, new_sources,
+                             scope if scope is not None else "inscope",
+                             urls_counts.get(subdomain, 0),
+                             resolved if resolved is not None else "no",
+                             ip_address if ip_address is not None else "none",
+                             cdn_status if cdn_status is not None else "no",
+                             cdn_name if cdn_name is not None else "none",
+                             epoch, epoch, rev_host(subdomain)))
+                stats['added'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding subdomain | Subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} added to domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.BRIGHT} with sources: {Fore.BLUE}{Style.BRIGHT}{', '.join(sources)}{Style.RESET_ALL}, scope: {Fore.BLUE}{Style.BRIGHT}{scope}{Style.RESET_ALL}, resolved: {Fore.BLUE}{Style.BRIGHT}{resolved}{Style.RESET_ALL}, IP: {Fore.BLUE}{Style.BRIGHT}{ip_address}{Style.RESET_ALL}, cdn_status: {Fore.BLUE}{Style.BRIGHT}{cdn_status}{Style.RESET_ALL}, CDN Name: {Fore.BLUE}{Style.BRIGHT}{cdn_name}{Style.RESET_ALL}")
+                continue
+
+            update_fields = merge_subdomain_fields(current, scope=scope, resolved=resolved, ip_address=ip_address,
+                                                   cdn_status=cdn_status, cdn_name=cdn_name, unip=unip, uncdn_name=uncdn_name)
+
+            # A source change counts as an update of the subdomain itself
+            current_sources = existing_sources.get(subdomain, set())
+            updated_sources = (current_sources | set(sources)) - set(unsources)
+            if updated_sources != current_sources:
+                update_fields['source'] = ", ".join(sorted(updated_sources))
+                removed_sources.extend((subdomain, source) for source in current_sources - updated_sources)
+
+            if update_fields:
+                merged = dict(zip(merge_columns, current), **update_fields)
+                rows.append((subdomain, domain, program, update_fields.get('source'), merged['scope'], 0, merged['resolved'],
+                             merged['ip_address'], merged['cdn_status'], merged['cdn_name'], epoch, epoch, rev_host(subdomain)))
+                stats['updated'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | updating subdomain | subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} in domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with updates: {Fore.BLUE}{Style.BRIGHT}{update_fields}{Style.RESET_ALL}")
+            else:
+                stats['unchanged'] += 1
+                if report:
+                    print(f"{timestamp} | {Fore.YELLOW}info{Style.RESET_ALL} | updating subdomain | No updates for subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} in domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}")
+
+        # Existing rows already carry their merged values, so the conflict branch simply takes them over. The source
+        # list is written with the row (NULL: unchanged), so the change log records it in the same insert or update
+        # and the subdomain_sources triggers below find it up to date
+        cursor.executemany("""
+            INSERT INTO subdomains (subdomain, domain, program, source, scope, urls, resolved, ip_address, cdn_status, cdn_name, created_at, updated_at, rev_host)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(subdomain, domain, program) DO UPDATE SET
+                source = COALESCE(excluded.source, source), scope = excluded.scope, resolved = excluded.resolved, ip_address = excluded.ip_address,
+                cdn_status = excluded.cdn_status, cdn_name = excluded.cdn_name, updated_at = excluded.updated_at""", rows)
+
+        # Adding a source is one row per (subdomain, source); seeing it again only moves last_seen
+        cursor.executemany("""
+            INSERT INTO subdomain_sources (subdomain, domain, program, source, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(subdomain, domain, program, source) DO UPDATE SET last_seen = excluded.last_seen""",
+            [(subdomain, domain, program, source, epoch, epoch) for subdomain in chunk for source in sources if source not in unsources])
+        cursor.executemany("DELETE FROM subdomain_sources WHERE subdomain = ? AND domain = ? AND program = ? AND source = ?",
+                           [(subdomain, domain, program, source) for subdomain, source in removed_sources])
+        if commit_chunks:
+            conn.commit()
+
+    return stats
+
+def add_subdomain(subdomain_or_file, domain, program, sources=None, unsources=None, scope=None, resolved=None,
+                  ip_address=None, cdn_status=None, cdn_name=None, unip=None, uncdn_name=None):
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Check if the program exists
+    cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding subdomain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+        return
+
+    # Check if the domain exists
+    cursor.execute("SELECT * FROM domains WHERE domain = ? AND program = ?", (domain, program))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding subdomain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} does not exist in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}")
+        return
+
+    # A file or `-` (stdin) holds one subdomain per line
+    from_file = is_line_input(subdomain_or_file)
+    subdomains = read_lines(subdomain_or_file) if from_file else [subdomain_or_file]
+
+    try:
+        # Streamed input is committed chunk by chunk, so memory and the WAL stay bounded however long it is
+        stats = ingest_subdomains(subdomains, domain, program, sources=sources, unsources=unsources, scope=scope, resolved=resolved,
+                                  ip_address=ip_address, cdn_status=cdn_status, cdn_name=cdn_name, unip=unip, uncdn_name=uncdn_name,
+                                  timestamp=timestamp, report=not from_file, commit_chunks=from_file)
+        conn.commit()
+    except sqlite3.DatabaseError as e:
+        conn.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding subdomain | database error: {e}")
+        return
+
+    if from_file:
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding subdomain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}: "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['added']}{Style.RESET_ALL} added, {Fore.BLUE}{Style.BRIGHT}{stats['updated']}{Style.RESET_ALL} updated, "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['unchanged']}{Style.RESET_ALL} unchanged")
+
+def build_domain_trie(program='*', trie=None):
+    # Reversed-label suffix trie of the registered domains: example.co.uk lives at trie['uk']['co']['example'],
+    # and the node's '' key holds the (domain, program) that owns it. Given a trie, the domains are added to it
+    if program == '*':
+        cursor.execute("SELECT domain, program FROM domains")
+    else:
+        cursor.execute("SELECT domain, program FROM domains WHERE program = ?", (program,))
+    trie = {} if trie is None else trie
+    for domain, domain_program in cursor:
+        node = trie
+        for label in reversed(domain.lower().rstrip('.').split('.')):
+            node = node.setdefault(label, {})
+        node[''] = (domain, domain_program)
+    return trie
+
+def route_host(trie, host):
+    # Walk the host's labels from the TLD down and keep the deepest registered domain seen: O(labels)
+    owner = None
+    node = trie
+    for label in reversed(host.split('.')):
+        node = node.get(label)
+        if node is None:
+            break
+        owner = node.get('', owner)
+    return owner
+
+def route_subdomains(file_path, program='*', sources=None, scope=None, resolved=None, ip_address=None, cdn_status=None, cdn_name=None,
+                     databases=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | routing subdomain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    if not is_line_input(file_path):
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | routing subdomain | file {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL} does not exist")
+        return
+
+    # With sharded programs (databases: program -> connection and cursor of its file) the trie holds the domains of
+    # every file, and each host is written to the file of the program owning its domain
+    catalogue = conn, cursor
+    databases = databases or {}
+    trie = {}
+    for database in [catalogue, *databases.values()]:
+        select_database(database)
+        build_domain_trie(program, trie)
+    select_database(catalogue)
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0}
+    unmatched = 0
+    unmatched_sample = []
+
+    try:
+        for chunk in chunked(read_lines(file_path)):
+            # Group the chunk by owning domain, then reuse the regular bulk upsert once per group
+            groups = {}
+            for line in chunk:
+                host = line.split()[0].lower().rstrip('.')  # Tolerate "host [A] [1.2.3.4]" style tool output
+                owner = route_host(trie, host)
+                if owner is None:
+                    unmatched += 1
+                    if len(unmatched_sample) < 5:
+                        unmatched_sample.append(host)
+                    continue
+                groups.setdefault(owner, []).append(host)
+
+            for (domain, domain_program), hosts in groups.items():
+                select_database(databases.get(domain_program, catalogue))
+                group_stats = ingest_subdomains(hosts, domain, domain_program, sources=sources, scope=scope, resolved=resolved,
+                                                ip_address=ip_address, cdn_status=cdn_status, cdn_name=cdn_name, timestamp=timestamp)
+                for key in stats:
+                    stats[key] += group_stats[key]
+            for connection, _ in [catalogue, *databases.values()]:
+                connection.commit()  # One transaction per chunk
+    except sqlite3.DatabaseError as e:
+        for connection, _ in [catalogue, *databases.values()]:
+            connection.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | routing subdomain | database error: {e}")
+        return
+    finally:
+        select_database(catalogue)
+
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | routing subdomain | {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL}: "
+          f"{Fore.BLUE}{Style.BRIGHT}{stats['added']}{Style.RESET_ALL} added, {Fore.BLUE}{Style.BRIGHT}{stats['updated']}{Style.RESET_ALL} updated, "
+          f"{Fore.BLUE}{Style.BRIGHT}{stats['unchanged']}{Style.RESET_ALL} unchanged, {Fore.BLUE}{Style.BRIGHT}{unmatched}{Style.RESET_ALL} without a registered domain"
+          + (f" (e.g. {', '.join(unmatched_sample)})" if unmatched_sample else ""))
+
+# --stats-* dimensions per listing: option suffix -> (SQL expression, label), checked in this order
+SUBDOMAIN_STATS = {
+    'scope': ('scope', 'Scope'), 'cdn_status': ('cdn_status', 'CDN Status'),
+    'cdn_name': ('cdn_name', 'CDN Name'), 'resolved': ('resolved', 'Resolved Status'), 'ip_address': ('ip_address', 'IP Address'),
+    'program': ('program', 'Program'), 'domain': ('domain', 'Domain'), 'created_at': ('created_at', 'Created At'),
+    'updated_at': ('updated_at', 'Updated At'),
+}
+
+URL_STATS = {
+    'subdomain': ('subdomain', 'Subdomain'), 'domain': ('domain', 'Domain'), 'program': ('program', 'Program'),
+    'scheme': ('scheme', 'Scheme'), 'method': ('method', 'Method'), 'port': ('port', 'Port'),
+    'status_code': ('status_code', 'Status Code'), 'scope': ('scope', 'Scope'), 'title': ('title', 'Title'),
+    'ip_address': ('ip_address', 'IP Address'), 'cdn_status': ('cdn_status', 'CDN Status'), 'cdn_name': ('cdn_name', 'CDN Name'),
+    'webserver': ('webserver', 'Webserver'), 'webtech': ('webtech', 'Webtech'), 'cname': ('cname', 'CNAME'),
+    'location': ('location', 'Location'), 'created_at': ('created_at', 'Created At'), 'updated_at': ('updated_at', 'Updated At'),
+    'flag': ('flag', 'Flag'), 'path': ('path', 'Path'), 'content_length': ('content_length', 'Content Length'),
+}
+
+IP_STATS = {
+    # "domain" of an IP is its second octet
+    'domain': ("CASE WHEN instr(ip, '.') > 0 THEN substr(ip, instr(ip, '.') + 1, instr(substr(ip, instr(ip, '.') + 1) || '.', '.') - 1) ELSE 'Unknown' END", 'Domain'),
+    'cidr': ('cidr', 'CIDR'), 'asn': ('asn', 'ASN'),
+}
+
+def print_stats(table, expression, label, where='', parameters=(), top=None, order='count', total=None):
+    # Compile one --stats-* dimension into a single GROUP BY over the listing's own WHERE clause.
+    # Percentages are computed in SQL against all matching rows (or against `total`, an SQL
+    # expression, when a row can fall into several groups) and only the groups reach Python.
+    denominator = total or "SUM(COUNT(*)) OVER ()"
+    query = (f"SELECT value, COUNT(*), 100.0 * COUNT(*) / {denominator} FROM (SELECT {expression} AS value FROM {table}{where}) "
+             f"GROUP BY value ORDER BY {'2 DESC, 1' if order == 'count' else '1'}")
+    params = list(parameters) * (2 if total else 1)
+    if top:
+        query += " LIMIT ?"
+        params.append(top)
+
+    print(f"{label} statistics:")
+    for value, count, percentage in cursor.execute(query, params):
+        print(f"{value}: {count} ({percentage or 0:.2f}%)")
+
+def subdomain_record(sub):
+    return {
+        "subdomain": sub[0], 
+        "domain": sub[1], 
+        "program": sub[11],
+        "source": sub[2], 
+        "scope": sub[3], 
+        "urls": sub[4],
+        "resolved": sub[5],
+        "ip_address": sub[6], 
+        "cdn_status": sub[7], 
+        "cdn_name": sub[8],
+        "created_at": format_time(sub[9]), 
+        "updated_at": format_time(sub[10])
+    }
+
+def subdomain_filters(subdomain='*', domain='*', program='*', match='contains', sources=None, source_only=False, scope=None,
+                      resolved=None, ip=None, cdn_status=None, cdn_name=None, create_time=None, update_time=None):
+    # WHERE clause shared by subdomain list and delete, so a --count covers exactly the rows a delete removes
+    clauses = time_clauses(create_time, update_time)
+
+    # Source filters run against the indexed subdomain_sources table
+    source_list = split_sources(sources)
+    if source_list and source_only:
+        # Subdomains whose only source is the first one given
+        clauses.append(("(subdomain, domain, program) IN (SELECT subdomain, domain, program FROM subdomain_sources s WHERE source = ? AND NOT EXISTS "
+                        "(SELECT 1 FROM subdomain_sources o WHERE o.subdomain = s.subdomain AND o.domain = s.domain AND o.program = s.program AND o.source != s.source))",
+                        [source_list[0]]))
+    elif source_list:
+        clauses.append((f"(subdomain, domain, program) IN (SELECT subdomain, domain, program FROM subdomain_sources WHERE source IN ({', '.join('?' for _ in source_list)}))",
+                        source_list))
+
+    return compile_filters([('program', program, 'exact'), ('domain', domain, None), ('subdomain', subdomain, None),
+                            ('scope', scope, 'exact'), ('resolved', resolved, 'exact'), ('cdn_status', cdn_status, 'exact'),
+                            ('ip_address', ip, None), ('cdn_name', cdn_name, None)], match, clauses)
+
+def list_subdomains(subdomain='*', domain='*', program='*', sources=None, scope=None, resolved=None, brief=False, source_only=False,
+                    cdn_status=None, ip=None, cdn_name=None, create_time=None, update_time=None, count=False, stats_source=False,
+                    stats_scope=False, stats_cdn_status=False, stats_cdn_name=False, stats_resolved=False, stats_ip_address=False,
+                    stats_program=False, stats_domain=False, stats_created_at=False, stats_updated_at=False, stats_top=None, stats_order='count',
+                    stats_bucket='second', output_format='json', match='contains'):
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    # Check if program exists if specified
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing subdomain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    # Base query and parameters
+    try:
+        where, parameters = subdomain_filters(subdomain, domain, program, match, sources=sources, source_only=source_only, scope=scope,
+                                              resolved=resolved, ip=ip, cdn_status=cdn_status, cdn_name=cdn_name,
+                                              create_time=create_time, update_time=update_time)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing subdomain | {e}")
+        return
+    query = "SELECT subdomain, domain, source, scope, urls, resolved, ip_address, cdn_status, cdn_name, created_at, updated_at, program FROM subdomains" + where
+
+    # Handle counting records
+    if count:
+        cursor.execute("SELECT COUNT(*) FROM subdomains" + where, parameters)
+        print(cursor.fetchone()[0])
+        return
+
+    # Output the requested statistics straight from SQL
+    stats = next((name for name, wanted in (('source', stats_source), ('scope', stats_scope), ('cdn_status', stats_cdn_status),
+                                             ('cdn_name', stats_cdn_name), ('resolved', stats_resolved), ('ip_address', stats_ip_address),
+                                             ('program', stats_program), ('domain', stats_domain), ('created_at', stats_created_at),
+                                             ('updated_at', stats_updated_at)) if wanted), None)
+    if stats == 'source':
+        # One row per source, so a subdomain counts once for each of its sources
+        print_stats(f"""(SELECT subdomain, domain, program FROM subdomains{where}) m LEFT JOIN subdomain_sources s
+                        ON s.subdomain = m.subdomain AND s.domain = m.domain AND s.program = m.program""",
+                    "COALESCE(s.source, '')", 'Source', parameters=parameters, top=stats_top, order=stats_order,
+                    total=f"(SELECT COUNT(*) FROM subdomains{where})")
+        return
+    if stats in ('created_at', 'updated_at'):
+        print_stats('subdomains', TIME_BUCKETS[stats_bucket].format(column=stats), SUBDOMAIN_STATS[stats][1], where=where, parameters=parameters,
+                    top=stats_top, order=stats_order)
+        return
+    if stats:
+        print_stats('subdomains', *SUBDOMAIN_STATS[stats], where=where, parameters=parameters, top=stats_top, order=stats_order)
+        return
+
+    # Execute the query; rows are unique per (subdomain, domain, program), so no grouping or sort is needed
+    cursor.execute(query, parameters)
+    if output_format == 'ndjson' and not brief:
+        write_ndjson(cursor, subdomain_record)
+        return
+    subdomains = cursor.fetchall()
+
+    # Output results
+    if subdomains:
+        if brief:
+            print("\n".join(sub[0] for sub in subdomains))
+        else:
+            result = [subdomain_record(sub) for sub in subdomains]
+            print(json.dumps(result, indent=4))
+
+def delete_subdomain(sub='*', domain='*', program='*', scope=None, source=None, resolved=None, ip_address=None, cdn_status=None, cdn_name=None,
+                     match='exact'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Check if program exists
+    if program != '*':
+        cursor.execute("SELECT COUNT(1) FROM programs WHERE program = ?", (program,))
+        if cursor.fetchone()[0] == 0:
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting subdomain | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    # Exact names can be checked up front; the other match modes are patterns
+    if domain != '*' and match == 'exact':
+        cursor.execute("SELECT COUNT(1) FROM domains WHERE domain = ?", (domain,))
+        if cursor.fetchone()[0] == 0:
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting subdomain | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} does not exist")
+            return
+
+    if sub != '*' and match == 'exact':
+        cursor.execute("SELECT COUNT(1) FROM subdomains WHERE subdomain = ? AND domain = ? AND program = ?", (sub, domain, program))
+        if cursor.fetchone()[0] == 0:
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting subdomain | subdomain {Fore.BLUE}{Style.BRIGHT}{sub}{Style.RESET_ALL} does not exist in domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} and program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}")
+            return
+
+    # Build the filter message to display which filters were used
+    filter_msg = f"subdomain={sub}"
+    if domain != "*":
+        filter_msg += f", domain={domain}"
+    if program != "*":
+        filter_msg += f", program={program}"
+    if scope:
+        filter_msg += f", scope={scope}"
+    if source:
+        filter_msg += f", source={source}"
+    if resolved:
+        filter_msg += f", resolved={resolved}"
+    if ip_address:
+        filter_msg += f", ip_address={ip_address}"
+    if cdn_status:
+        filter_msg += f", cdn_status={cdn_status}"
+    if cdn_name:
+        filter_msg += f", cdn_name={cdn_name}"
+    if match != 'exact':
+        filter_msg += f", match={match}"
+
+    # The same WHERE clause `subdomain list --count` reports on
+    try:
+        where, params = subdomain_filters(sub, domain, program, match, sources=[source] if source else None, scope=scope, resolved=resolved,
+                                          ip=ip_address, cdn_status=cdn_status, cdn_name=cdn_name)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting subdomain | {e}")
+        return
+    cursor.execute("DELETE FROM subdomains" + where, params)
+    total_deleted = cursor.rowcount  # Get the count of deleted rows
+    conn.commit()
+
+    if total_deleted > 0:
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting subdomain | deleted {total_deleted} matching entries from {Fore.BLUE}{Style.BRIGHT}subdomains{Style.RESET_ALL} table with filters: {Fore.BLUE}{Style.BRIGHT}{filter_msg}{Style.RESET_ALL}")
+    else:
+        print(f"{timestamp} | {Fore.YELLOW}info{Style.RESET_ALL} | deleting subdomain | no subdomains were deleted with filters: {Fore.BLUE}{Style.BRIGHT}{filter_msg}{Style.RESET_ALL}")
+
+def add_url(url, subdomain, domain, program, scheme=None, method=None, port=None, status_code=None, scope=None,
+            ip_address=None, cdn_status=None, cdn_name=None, title=None, webserver=None, webtech=None, cname=None,
+            location=None, flag=None, content_length=None, path=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Check if the program exists
+    cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding url | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+        return
+
+    # Check if the domain exists
+    cursor.execute("SELECT * FROM domains WHERE domain = ? AND program = ?", (domain, program))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding url | domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} does not exist in program '{program}'")
+        return
+
+    # Check if the subdomain exists
+    cursor.execute("SELECT * FROM subdomains WHERE subdomain = ? AND domain = ? AND program = ?", (subdomain, domain, program))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding url | subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} in domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} does not exist in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}")
+        return
+
+    # A file or `-` (stdin) holds one url per line, all sharing the given subdomain and details
+    if is_line_input(url):
+        fields = {'scheme': scheme, 'method': method, 'port': port, 'path': path, 'status_code': status_code,
+                  'content_length': content_length, 'ip_address': ip_address, 'cdn_status': cdn_status, 'cdn_name': cdn_name,
+                  'title': title, 'webserver': webserver, 'webtech': webtech, 'cname': cname, 'location': location, 'flag': flag}
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0}
+        try:
+            for chunk in chunked(read_lines(url)):
+                rows = [dict(fields, url=line, subdomain=subdomain, domain=domain, program=program,
+                             scope=scope or 'inscope', timestamp=timestamp) for line in dict.fromkeys(chunk)]
+                upsert_urls(rows, stats)
+                if scope is not None:
+                    # The upsert only sets scope on insert; an explicit --scope also moves existing urls
+                    cursor.executemany("UPDATE urls SET scope = ?, updated_at = ? WHERE url = ? AND subdomain = ? AND domain = ? AND program = ? AND scope != ?",
+                                       [(scope, to_epoch(timestamp), row['url'], subdomain, domain, program, scope) for row in rows])
+                conn.commit()  # One transaction per chunk
+        except sqlite3.DatabaseError as e:
+            conn.rollback()
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding url | database error: {e}")
+            return
+
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding url | subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}: "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['added']}{Style.RESET_ALL} added, {Fore.BLUE}{Style.BRIGHT}{stats['updated']}{Style.RESET_ALL} updated, "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['unchanged']}{Style.RESET_ALL} unchanged")
+        return
+
+    # Check if the url exists
+    cursor.execute("SELECT * FROM urls WHERE url = ? AND subdomain = ? AND domain = ? AND program = ?", (url, subdomain, domain, program))
+    existing = cursor.fetchone()
+
+    update_fields = {}
+
+    if existing:
+        # Subdomain exists, check for updates
+        if scheme is not None and scheme != existing[4]:
+            update_fields['scheme'] = scheme
+        if method is not None and method != existing[5]:
+            update_fields['method'] = method
+        if port is not None and port != existing[6]:
+            update_fields['port'] = port
+        if path is not None and path != existing[7]:  # Corrected index for path
+            update_fields['path'] = path
+        if flag is not None and flag != existing[8]:  # Corrected index for flag
+            update_fields['flag'] = flag
+        if status_code is not None and status_code != existing[9]:
+            update_fields['status_code'] = status_code
+        if scope is not None and scope != existing[10]:
+            update_fields['scope'] = scope
+        if content_length is not None and content_length != existing[11]:  # Corrected index for content_length
+            update_fields['content_length'] = content_length
+        if ip_address is not None and ip_address != existing[12]:
+            update_fields['ip_address'] = ip_address
+        if cdn_status is not None and cdn_status != existing[13]:
+            update_fields['cdn_status'] = cdn_status
+        if cdn_name is not None and cdn_name != existing[14]:
+            update_fields['cdn_name'] = cdn_name
+        if title is not None and title != existing[15]:
+            update_fields['title'] = title
+        if webserver is not None and webserver != existing[16]:
+            update_fields['webserver'] = webserver
+        if webtech is not None and webtech != existing[17]:
+            update_fields['webtech'] = webtech
+        if cname is not None and cname != existing[18]:
+            update_fields['cname'] = cname
+        if location is not None and location != existing[19]:
+            update_fields['location'] = location
+
+        # Always update the timestamp
+        if update_fields:
+            update_query = "UPDATE urls SET " + ", ".join(f"{col} = ?" for col in update_fields) + ", updated_at = ? WHERE url = ? AND subdomain = ? AND domain = ? AND program = ?"
+            cursor.execute(update_query, (*update_fields.values(), to_epoch(timestamp), url, subdomain, domain, program))
+            if 'webtech' in update_fields:
+                sync_url_tech([(url, subdomain, domain, program, webtech)])
+            conn.commit()
+            print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | updating url | url {Fore.BLUE}{Style.BRIGHT}{url}{Style.RESET_ALL} in subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} in domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with updates: {Fore.BLUE}{Style.BRIGHT}{update_fields}{Style.RESET_ALL}")
+        else:
+            print(f"{timestamp} | {Fore.YELLOW}info{Style.RESET_ALL} | updating url | No update for url {Fore.BLUE}{Style.BRIGHT}{url}{Style.RESET_ALL}")
+    else:
+        # Insert new url
+        cursor.execute(""" 
+            INSERT INTO urls (url, subdomain, domain, program, scheme, method, port, path, flag, status_code, scope, content_length, ip_address, cdn_status, cdn_name, title, webserver, webtech, cname, location, created_at, updated_at, rev_host)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (url, subdomain, domain, program, 
+             scheme if scheme is not None else "none", 
+             method if method is not None else "none", 
+             port if port is not None else "none", 
+             path if path is not None else "/", 
+             flag if flag is not None else "none",
+             status_code if status_code is not None else "none", 
+             scope if scope is not None else "inscope",  
+             content_length if content_length is not None else "none",
+             ip_address if ip_address is not None else "none", 
+             cdn_status if cdn_status is not None else "no", 
+             cdn_name if cdn_name is not None else "none", 
+             title if title is not None else "none", 
+             webserver if webserver is not None else "none", 
+             webtech if webtech is not None else "none", 
+             cname if cname is not None else "none", 
+             location if location is not None else "none",
+             to_epoch(timestamp), to_epoch(timestamp), rev_host(subdomain)))
+        if webtech is not None:
+            sync_url_tech([(url, subdomain, domain, program, webtech)])
+        
+        conn.commit()
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding url | url {Fore.BLUE}{Style.BRIGHT}{url}{Style.RESET_ALL} added to subdomain {Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL} in domain {Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL} in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with details: scheme={Fore.BLUE}{Style.BRIGHT}{scheme}{Style.RESET_ALL}, method={Fore.BLUE}{Style.BRIGHT}{method}{Style.RESET_ALL}, port={Fore.BLUE}{Style.BRIGHT}{port}{Style.RESET_ALL}, status_code={Fore.BLUE}{Style.BRIGHT}{status_code}{Style.RESET_ALL}, location={Fore.BLUE}{Style.BRIGHT}{location}{Style.RESET_ALL}, scope={Fore.BLUE}{Style.BRIGHT}{scope}{Style.RESET_ALL}, cdn_status={Fore.BLUE}{Style.BRIGHT}{cdn_status}{Style.RESET_ALL}, cdn_name={Fore.BLUE}{Style.BRIGHT}{cdn_name}{Style.RESET_ALL}, title={Fore.BLUE}{Style.BRIGHT}{title}{Style.RESET_ALL}, webserver={Fore.BLUE}{Style.BRIGHT}{webserver}{Style.RESET_ALL}, webtech={Fore.BLUE}{Style.BRIGHT}{webtech}{Style.RESET_ALL}, cname={Fore.BLUE}{Style.BRIGHT}{cname}{Style.RESET_ALL}""")
+
+# urls columns set by the bulk upserts (httpx import, url add from a list), with the value stored when a field is missing on insert
+URL_UPSERT_COLUMNS = {
+    'scheme': 'none', 'method': 'none', 'port': 'none', 'path': '/', 'status_code': 'none', 'content_length': 'none',
+    'ip_address': 'none', 'cdn_status': 'no', 'cdn_name': 'none', 'title': 'none', 'webserver': 'none',
+    'webtech': 'none', 'cname': 'none', 'location': 'none', 'flag': 'none',
+}
+
+URL_UPSERT_SQL = f"""
+    INSERT INTO urls (url, subdomain, domain, program, scope, created_at, updated_at, rev_host, {', '.join(URL_UPSERT_COLUMNS)})
+    VALUES (:url, :subdomain, :domain, :program, :scope, :timestamp, :timestamp, :rev_host, {', '.join(f"COALESCE(:{col}, '{default}')" for col, default in URL_UPSERT_COLUMNS.items())})
+    ON CONFLICT(url, subdomain, domain, program) DO UPDATE SET
+        {', '.join(f"{col} = COALESCE(:{col}, {col})" for col in URL_UPSERT_COLUMNS)}, updated_at = :timestamp
+    WHERE {' OR '.join(f"COALESCE(:{col}, {col}) IS NOT {col}" for col in URL_UPSERT_COLUMNS)}"""
+
+def upsert_urls(chunk, stats):
+    # Upsert one chunk of url rows (dicts keyed like URL_UPSERT_SQL) and tally added/updated/unchanged
+    placeholders = ", ".join("?" for _ in chunk)
+    cursor.execute(f"SELECT url, subdomain, domain, program FROM urls WHERE url IN ({placeholders})", [row['url'] for row in chunk])
+    existing = set(cursor.fetchall())
+    new_keys = {(row['url'], row['subdomain'], row['domain'], row['program']) for row in chunk} - existing
+
+    for row in chunk:
+        row['rev_host'] = rev_host(row['subdomain'])
+        row['timestamp'] = to_epoch(row['timestamp'])
+
+    # rowcount counts only rows the upsert itself touched, not the counter triggers' writes
+    cursor.executemany(URL_UPSERT_SQL, chunk)
+    changed = cursor.rowcount
+    sync_url_tech([(row['url'], row['subdomain'], row['domain'], row['program'], row['webtech'])
+                   for row in chunk if row.get('webtech') is not None])
+
+    stats['added'] += len(new_keys)
+    stats['updated'] += changed - len(new_keys)
+    stats['unchanged'] += len(chunk) - changed
+
+def parse_httpx_record(record):
+    # Map one httpx JSON object onto urls columns; absent fields stay None so they never overwrite stored values
+    import ipaddress
+    from urllib.parse import urlsplit
+
+    url = record.get('url')
+    if not url:
+        return None
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return None
+
+    def joined(value):
+        if isinstance(value, list):
+            return ", ".join(str(item) for item in value) if value else None
+        return str(value) if value not in (None, '') else None
+
+    port = record.get('port') or parts.port
+    if port is None and parts.scheme in ('http', 'https'):
+        port = 443 if parts.scheme == 'https' else 80
+
+    # Older httpx releases put the resolved IP in "host", newer ones in "host_ip" or the "a" records
+    ip_address = record.get('host_ip') or (record.get('a') or [None])[0]
+    if ip_address is None and record.get('host'):
+        try:
+            ip_address = str(ipaddress.ip_address(record['host']))
+        except ValueError:
+            pass
+
+    cdn = record.get('cdn')
+    return {
+        'url': url,
+        'subdomain': parts.hostname.lower(),
+        'scheme': record.get('scheme') or parts.scheme or None,
+        'method': record.get('method'),
+        'port': int(port) if port is not None else None,
+        'path': record.get('path') or parts.path or None,
+        'status_code': record.get('status_code'),
+        'content_length': joined(record.get('content_length')),
+        'ip_address': ip_address,
+        'cdn_status': None if cdn is None else ('yes' if cdn else 'no'),
+        'cdn_name': record.get('cdn_name'),
+        'title': record.get('title'),
+        'webserver': record.get('webserver'),
+        'webtech': joined(record.get('tech')),
+        'cname': joined(record.get('cname')),
+        'location': record.get('location'),
+        'flag': None,
+    }
+
+def import_urls(file_path, program='*', databases=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing url | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    if not is_line_input(file_path):
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing url | file {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL} does not exist")
+        return
+
+    # Resolve hosts to their subdomain rows once instead of running existence checks per record. With sharded
+    # programs (databases: program -> connection and cursor of its file) that is the subdomains of every file, and
+    # each row is written to the file of its program
+    catalogue = conn, cursor
+    databases = databases or {}
+    hosts = {}
+    for database in [catalogue, *databases.values()]:
+        select_database(database)
+        if program == '*':
+            cursor.execute("SELECT subdomain, domain, program, scope FROM subdomains")
+        else:
+            cursor.execute("SELECT subdomain, domain, program, scope FROM subdomains WHERE program = ?", (program,))
+        for subdomain, domain, sub_program, scope in cursor:
+            hosts.setdefault(subdomain.lower(), []).append((subdomain, domain, sub_program, scope))
+    select_database(catalogue)
+
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0, 'unmatched': 0, 'invalid': 0}
+
+    def records():
+        for line in read_lines(file_path):
+            try:
+                record = parse_httpx_record(json.loads(line))
+            except (ValueError, TypeError, AttributeError):
+                record = None
+            if record is None:
+                stats['invalid'] += 1
+                continue
+            owners = hosts.get(record['subdomain'])
+            if not owners:
+                stats['unmatched'] += 1
+                continue
+            for subdomain, domain, sub_program, scope in owners:
+                yield dict(record, subdomain=subdomain, domain=domain, program=sub_program,
+                           scope=scope or 'inscope', timestamp=timestamp)
+
+    try:
+        for chunk in chunked(records()):
+            groups = {}
+            for row in chunk:
+                groups.setdefault(row['program'] if row['program'] in databases else None, []).append(row)
+            for shard_program, rows in groups.items():
+                select_database(databases.get(shard_program, catalogue))
+                upsert_urls(rows, stats)
+            for connection, _ in [catalogue, *databases.values()]:
+                connection.commit()  # One transaction per chunk
+
+    except sqlite3.DatabaseError as e:
+        for connection, _ in [catalogue, *databases.values()]:
+            connection.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | importing url | database error: {e}")
+        return
+    finally:
+        select_database(catalogue)
+
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | importing url | {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL}: "
+          f"{Fore.BLUE}{Style.BRIGHT}{stats['added']}{Style.RESET_ALL} added, {Fore.BLUE}{Style.BRIGHT}{stats['updated']}{Style.RESET_ALL} updated, "
+          f"{Fore.BLUE}{Style.BRIGHT}{stats['unchanged']}{Style.RESET_ALL} unchanged, {Fore.BLUE}{Style.BRIGHT}{stats['unmatched']}{Style.RESET_ALL} without a known subdomain, "
+          f"{Fore.BLUE}{Style.BRIGHT}{stats['invalid']}{Style.RESET_ALL} invalid lines")
+
+def url_record(sub):
+    return {
+        "url": sub[0], "subdomain": sub[1], "domain": sub[2], "program": sub[3], "scheme": sub[4],
+        "method": sub[5], "port": sub[6], "path": sub[20], "flag": sub[18], "status_code": sub[7],
+        "scope": sub[21], "content_length": sub[19], "ip_address": sub[8], "cdn_status": sub[9],
+        "cdn_name": sub[10], "title": sub[11], "webserver": sub[12], "webtech": sub[13], "cname": sub[14],
+        "location": sub[15], "created_at": format_time(sub[16]), "updated_at": format_time(sub[17])
+    }
+
+def url_filters(url='*', subdomain='*', domain='*', program='*', match='contains', scope=None, scheme=None, method=None, port=None,
+                status_code=None, ip=None, cdn_status=None, cdn_name=None, title=None, webserver=None, webtech=None, cname=None,
+                location=None, flag=None, path=None, content_length=None, create_time=None, update_time=None):
+    # WHERE clause shared by url list and delete, so a --count covers exactly the rows a delete removes
+    clauses = time_clauses(create_time, update_time)
+    if webtech:
+        subquery, values = tech_filter(webtech)
+        clauses.append((f"(url, subdomain, domain, program) IN ({subquery})", values))
+
+    return compile_filters([('program', program, 'exact'), ('url', url, None), ('subdomain', subdomain, None), ('domain', domain, None),
+                            ('scope', scope, 'exact'), ('scheme', scheme, 'exact'), ('method', method, None), ('port', port, 'exact'),
+                            ('status_code', status_code, 'exact'), ('ip_address', ip, None), ('cdn_status', cdn_status, 'exact'),
+                            ('cdn_name', cdn_name, None), ('title', title, None), ('webserver', webserver, None), ('cname', cname, None),
+                            ('location', location, None), ('flag', flag, 'exact'), ('path', path, 'exact'),
+                            ('content_length', content_length, 'exact')], match, clauses)
+
+def list_urls(url='*', subdomain='*', domain='*', program='*', scheme=None, method=None, port=None, 
+               status_code=None, ip=None, cdn_status=None, cdn_name=None, title=None, webserver=None,
+               webtech=None, cname=None, create_time=None, update_time=None, brief=False, scope=None,
+               location=None, count=False, stats_subdomain=False, stats_domain=False, stats_program=False,
+               stats_scheme=False, stats_method=False, stats_port=False, stats_status_code=False, stats_scope=False, 
+               stats_title=False, stats_ip_address=False, stats_cdn_status=False, stats_cdn_name=False, stats_webserver=False,
+               stats_webtech=False, stats_cname=False, stats_location=False, stats_created_at=False, stats_updated_at=False, 
+               flag=None, content_length=None, path=None, stats_flag=None, stats_content_length=None, stats_path=None,
+               stats_top=None, stats_order='count', stats_bucket='second', output_format='json', match='contains'):
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Check if the program exists if program is not '*'
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing url | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    # Base query for urls
+    try:
+        where, parameters = url_filters(url, subdomain, domain, program, match, scope=scope, scheme=scheme, method=method, port=port,
+                                        status_code=status_code, ip=ip, cdn_status=cdn_status, cdn_name=cdn_name, title=title,
+                                        webserver=webserver, webtech=webtech, cname=cname, location=location, flag=flag, path=path,
+                                        content_length=content_length, create_time=create_time, update_time=update_time)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing url | {e}")
+        return
+    query = "SELECT url, subdomain, domain, program, scheme, method, port, status_code, ip_address, cdn_status, cdn_name, title, webserver, webtech, cname, location, created_at, updated_at, flag, content_length, path, scope FROM urls" + where
+
+    # If count is requested, modify the query
+    if count:
+        cursor.execute("SELECT COUNT(*) FROM urls" + where, parameters)
+        count_result = cursor.fetchone()[0]
+        print(count_result)
+        return
+
+    # Output the requested statistics straight from SQL
+    stats = next((name for name, wanted in (('subdomain', stats_subdomain), ('domain', stats_domain), ('program', stats_program),
+                                             ('scheme', stats_scheme), ('method', stats_method), ('port', stats_port),
+                                             ('status_code', stats_status_code), ('scope', stats_scope), ('title', stats_title),
+                                             ('ip_address', stats_ip_address), ('cdn_status', stats_cdn_status), ('cdn_name', stats_cdn_name),
+                                             ('webserver', stats_webserver), ('webtech', stats_webtech), ('cname', stats_cname),
+                                             ('location', stats_location), ('created_at', stats_created_at), ('updated_at', stats_updated_at),
+                                             ('flag', stats_flag), ('path', stats_path), ('content_length', stats_content_length)) if wanted), None)
+    if stats == 'webtech':
+        # One row per technology, so a url counts once for each technology it runs
+        print_stats(f"""(SELECT url, subdomain, domain, program FROM urls{where}) m LEFT JOIN url_tech t
+                        ON t.url = m.url AND t.subdomain = m.subdomain AND t.domain = m.domain AND t.program = m.program""",
+                    "COALESCE(t.tech, 'none') COLLATE NOCASE", 'Webtech', parameters=parameters, top=stats_top, order=stats_order,
+                    total=f"(SELECT COUNT(*) FROM urls{where})")
+        return
+    if stats in ('created_at', 'updated_at'):
+        print_stats('urls', TIME_BUCKETS[stats_bucket].format(column=stats), URL_STATS[stats][1], where=where, parameters=parameters,
+                    top=stats_top, order=stats_order)
+        return
+    if stats:
+        print_stats('urls', *URL_STATS[stats], where=where, parameters=parameters, top=stats_top, order=stats_order)
+        return
+
+    # Execute the final query
+    cursor.execute(query, parameters)
+    if output_format == 'ndjson' and not brief:
+        write_ndjson(cursor, url_record)
+        return
+    live_urls = cursor.fetchall()
+
+    # Handle output
+    if live_urls:
+        if brief:
+            print("\n".join(sub[0] for sub in live_urls))  # Just print URL for brief
+        else:
+            result = [url_record(sub) for sub in live_urls]
+            print(json.dumps(result, indent=4))
+
+def search_urls(search, program='*', limit=100, brief=False, count=False, output_format='json'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | searching url | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    # Across shards (a federated run) each attached file has its own index: the search runs on every one and the
+    # matches are ranked together, though bm25 weighs terms by the statistics of the index that matched them
+    schemas = [row[1] for row in conn.execute("PRAGMA database_list") if row[1] == 'main' or row[1].startswith('shard_')]
+    if any(not cursor.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE name = 'urls_fts'").fetchone() for schema in schemas[1:]):
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | searching url | a sharded program has no search index yet: search it on its own first")
+        return
+
+    if not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'urls_fts'").fetchone():
+        # Databases migrated by an SQLite without FTS5 get their index the first time it is available
+        if not conn.in_transaction:
+            cursor.execute("BEGIN")
+        if not create_url_fts():
+            conn.rollback()
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | searching url | this SQLite build has no FTS5 support; use {Fore.BLUE}{Style.BRIGHT}url list --title{Style.RESET_ALL} instead")
+            return
+        conn.commit()
+
+    # FTS5 query syntax: AND / OR / NOT, prefix* and "phrase" queries, column filters such as title:jenkins
+    where = "urls_fts MATCH ?"
+    parameters = [search]
+    if program != '*':
+        where += " AND u.program = ?"
+        parameters.append(program)
+
+    # The urls table is named by schema too: unqualified, it is the TEMP VIEW over all files, without the FTS rowids
+    matches = lambda columns: " UNION ALL ".join(f"SELECT {columns} FROM {schema}.urls_fts JOIN {schema}.urls u ON u.rowid = urls_fts.rowid WHERE {where}"
+                                                 for schema in schemas)
+    parameters = parameters * len(schemas)
+
+    try:
+        if count:
+            cursor.execute(f"SELECT COUNT(*) FROM ({matches('1')})", parameters)
+            print(cursor.fetchone()[0])
+            return
+
+        # bm25 ranking with title matches weighted above path, location, cname and webserver matches
+        columns = """u.url, u.subdomain, u.domain, u.program, u.scheme, u.method, u.port, u.status_code, u.ip_address, u.cdn_status,
+                     u.cdn_name, u.title, u.webserver, u.webtech, u.cname, u.location, u.created_at, u.updated_at, u.flag,
+                     u.content_length, u.path, u.scope, bm25(urls_fts, 5.0, 2.0, 1.0, 1.0, 1.0) AS score"""
+        cursor.execute(f"SELECT * FROM ({matches(columns)}) ORDER BY score LIMIT ?", parameters + [limit if limit and limit > 0 else -1])
+        to_record = lambda row: dict(url_record(row), score=round(row[22], 4))
+        if brief:
+            for row in cursor:
+                print(row[0])
+        elif output_format == 'ndjson':
+            write_ndjson(cursor, to_record)
+        else:
+            print(json.dumps([to_record(row) for row in cursor.fetchall()], indent=4))
+    except sqlite3.OperationalError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | searching url | invalid search query {Fore.BLUE}{Style.BRIGHT}{search}{Style.RESET_ALL}: {e}")
+
+def delete_url(url='*', subdomain='*', domain='*', program='*', scope=None, scheme=None, 
+                          method=None, port=None, status_code=None, ip_address=None,
+                          cdn_status=None, cdn_name=None, title=None, webserver=None, 
+                          webtech=None, cname=None, location=None, flag=None, path=None, content_length=None, match='exact'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # Check if the program exists if program is not '*'
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting url | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    # The same WHERE clause `url list --count` reports on
+    try:
+        where, params = url_filters(url, subdomain, domain, program, match, scope=scope, scheme=scheme, method=method, port=port,
+                                    status_code=status_code, ip=ip_address, cdn_status=cdn_status, cdn_name=cdn_name, title=title,
+                                    webserver=webserver, webtech=webtech, cname=cname, location=location, flag=flag, path=path,
+                                    content_length=content_length)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting url | {e}")
+        return
+
+    # Execute the delete query
+    cursor.execute("DELETE FROM urls" + where, params)
+    conn.commit()
+
+    # Confirm deletion
+    if cursor.rowcount > 0:
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | deleting url | deleted {Fore.BLUE}{Style.BRIGHT}{cursor.rowcount}{Style.RESET_ALL} live entries for program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with filters: "
+              f"subdomain={Fore.BLUE}{Style.BRIGHT}{subdomain}{Style.RESET_ALL}, domain={Fore.BLUE}{Style.BRIGHT}{domain}{Style.RESET_ALL}, url={Fore.BLUE}{Style.BRIGHT}{url}{Style.RESET_ALL}, scope={Fore.BLUE}{Style.BRIGHT}{scope}{Style.RESET_ALL}, "
+              f"scheme={Fore.BLUE}{Style.BRIGHT}{scheme}{Style.RESET_ALL}, method={Fore.BLUE}{Style.BRIGHT}{method}{Style.RESET_ALL}, "
+              f"port='{port}', status_code='{status_code}', ip_address='{ip_address}', cdn_status='{cdn_status}', "
+              f"cdn_name={Fore.BLUE}{Style.BRIGHT}{cdn_name}{Style.RESET_ALL}, title={Fore.BLUE}{Style.BRIGHT}{title}{Style.RESET_ALL}, "
+              f"webserver={Fore.BLUE}{Style.BRIGHT}{webserver}{Style.RESET_ALL}, webtech={Fore.BLUE}{Style.BRIGHT}{webtech}{Style.RESET_ALL}, "
+              f"cname={Fore.BLUE}{Style.BRIGHT}{cname}{Style.RESET_ALL}, flag={Fore.BLUE}{Style.BRIGHT}{flag}{Style.RESET_ALL}, path={Fore.BLUE}{Style.BRIGHT}{path}{Style.RESET_ALL}, content_length={Fore.BLUE}{Style.BRIGHT}{content_length}{Style.RESET_ALL}")
+
+def ip_key(value):
+    # 16 bytes that sort like the addresses: IPv6 as is, IPv4 v4-mapped (::ffff:a.b.c.d); None for anything that is not an IP
+    import ipaddress
+
+    try:
+        address = value if isinstance(value, (ipaddress.IPv4Address, ipaddress.IPv6Address)) else ipaddress.ip_address(value.strip())
+    except (ValueError, AttributeError):
+        return None
+    if address.version == 4:
+        return b'\x00' * 10 + b'\xff\xff' + address.packed
+    return address.packed
+
+def key_address(key):
+    # Inverse of ip_key()
+    import ipaddress
+
+    if key[:12] == b'\x00' * 10 + b'\xff\xff':
+        return ipaddress.IPv4Address(key[12:])
+    return ipaddress.IPv6Address(key)
+
+def ip_range_filter(value):
+    # An IP or CIDR argument as an indexed ip_key range; None when the value is neither
+    import ipaddress
+
+    value = value.strip()
+    octets = value.rstrip('.').split('.')
+    if 1 <= len(octets) < 4 and all(octet.isdigit() for octet in octets):
+        # A partial IPv4 address is its octet prefix: 10.0.1 means 10.0.1.0/24, never 110.0.1.x
+        value = '.'.join(octets + ['0'] * (4 - len(octets))) + f"/{8 * len(octets)}"
+    try:
+        network = ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        return None
+    return "ip_key BETWEEN ? AND ?", [ip_key(network.network_address), ip_key(network.broadcast_address)]
+
+def upsert_ports(ip, program, ports, service, timestamp):
+    # Set-based merge of ports into ip_ports; the triggers refresh cidrs.port
+    cursor.executemany("""
+        INSERT INTO ip_ports (ip, program, port, service, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(ip, program, port) DO UPDATE SET service = COALESCE(excluded.service, service), last_seen = excluded.last_seen""",
+        [(ip, program, port, service, to_epoch(timestamp), to_epoch(timestamp)) for port in ports])
+
+def upsert_cves(ip, program, cves, timestamp):
+    # Set-based merge of CVEs into ip_cves; the triggers refresh cidrs.cves
+    cursor.executemany("""
+        INSERT INTO ip_cves (ip, program, cve, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(ip, program, cve) DO UPDATE SET last_seen = excluded.last_seen""",
+        [(ip, program, cve, to_epoch(timestamp), to_epoch(timestamp)) for cve in cves])
+
+def ingest_ip(ip, program, cidr=None, asn=None, ports=None, service=None, cves_list=None, timestamp=None, report=False):
+    # Add or update one IP; the caller owns the transaction. Returns 'added', 'updated' or 'unchanged'
+    cursor.execute("SELECT service, cidr, asn FROM cidrs WHERE ip = ? AND program = ?", (ip, program))
+    existing_entry = cursor.fetchone()
+
+    update_fields = {}
+    
+    if existing_entry:
+        existing_service, existing_cidr, existing_asn = existing_entry
+
+        # Ports are merged as a set: new ones are added, known ones only get last_seen (and a new service) refreshed
+        if ports:
+            cursor.execute(f"SELECT port FROM ip_ports WHERE ip = ? AND program = ? AND port IN ({', '.join('?' for _ in ports)})",
+                           (ip, program, *ports))
+            new_ports = set(ports) - {row[0] for row in cursor.fetchall()}
+            if new_ports:
+                update_fields['port'] = sorted(new_ports)
+            upsert_ports(ip, program, ports, service, timestamp)
+
+        if service is not None and service != existing_service:
+            update_fields['service'] = service
+        
+        # CVEs are merged as a set like ports; the cves column is maintained by the ip_cves triggers
+        if cves_list:
+            cursor.execute(f"SELECT cve FROM ip_cves WHERE ip = ? AND program = ? AND cve IN ({', '.join('?' for _ in cves_list)})",
+                           (ip, program, *cves_list))
+            new_cves = set(cves_list) - {row[0] for row in cursor.fetchall()}
+            if new_cves:
+                update_fields['cves'] = sorted(new_cves)
+            upsert_cves(ip, program, cves_list, timestamp)
+        
+        if cidr is not None and cidr != existing_cidr:
+            update_fields['cidr'] = cidr
+        
+        if asn is not None and asn != existing_asn:
+            update_fields['asn'] = asn
+
+        # Update the entry only if there are changes; the port and cves columns are maintained by triggers
+        if update_fields:
+            columns = [key for key in update_fields if key not in ('port', 'cves')]
+            set_clause = ''.join(f"{key} = ?, " for key in columns)
+            cursor.execute(f'''UPDATE cidrs 
+                              SET {set_clause}updated_at = ? 
+                              WHERE ip = ? AND program = ?''',
+                           (*[update_fields[key] for key in columns], to_epoch(timestamp), ip, program))
+            if report:
+                print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | updating IP | IP {Fore.BLUE}{Style.BRIGHT}{ip}{Style.RESET_ALL} updated in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with updates: {Fore.BLUE}{Style.BRIGHT}{update_fields}{Style.RESET_ALL}")
+            return 'updated'
+
+        if report:
+            print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | updating IP | IP {Fore.BLUE}{Style.BRIGHT}{ip}{Style.RESET_ALL} is unchanged in program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}")
+        return 'unchanged'
+
+    # Insert a new record with the current timestamp
+    ports_str = ', '.join(map(str, ports)) if ports else None
+    cursor.execute('''INSERT INTO cidrs (ip, program, cidr, asn, port, service, cves, created_at, updated_at, ip_key)
+                      VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                   (ip, program,
+                    cidr if cidr is not None else "none",
+                    asn if asn is not None else "none", 
+                    "none", 
+                    service if service is not None else "none", 
+                    "none", 
+                    to_epoch(timestamp), to_epoch(timestamp), ip_key(ip)))
+    if ports:
+        upsert_ports(ip, program, ports, service, timestamp)
+    if cves_list:
+        upsert_cves(ip, program, cves_list, timestamp)
+    if report:
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding IP | IP {Fore.BLUE}{Style.BRIGHT}{ip}{Style.RESET_ALL} added to program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} with {{ 'port': {ports_str} }}")
+    return 'added'
+
+def add_ip(ip_or_file, program, cidr=None, asn=None, port=None, service=None, cves=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+    if not cursor.fetchone():
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding IP | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+        return
+
+    # Process CVEs as a list of distinct ids (if provided)
+    cves_list = split_cves(cves) or None
+
+    # Ports as a sorted list of distinct integers
+    ports = sorted(set(port)) if port else None
+
+    # A file or `-` (stdin) holds one IP per line, all sharing the given details
+    if is_line_input(ip_or_file):
+        stats = {'added': 0, 'updated': 0, 'unchanged': 0}
+        try:
+            for chunk in chunked(read_lines(ip_or_file)):
+                for ip in dict.fromkeys(chunk):
+                    stats[ingest_ip(ip, program, cidr, asn, ports, service, cves_list, timestamp)] += 1
+                conn.commit()  # One transaction per chunk
+        except sqlite3.DatabaseError as e:
+            conn.rollback()
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | adding IP | database error: {e}")
+            return
+
+        print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | adding IP | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL}: "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['added']}{Style.RESET_ALL} added, {Fore.BLUE}{Style.BRIGHT}{stats['updated']}{Style.RESET_ALL} updated, "
+              f"{Fore.BLUE}{Style.BRIGHT}{stats['unchanged']}{Style.RESET_ALL} unchanged")
+        return
+
+    # Start a transaction (the daemon already has one open)
+    if not conn.in_transaction:
+        conn.execute("BEGIN TRANSACTION;")
+
+    try:
+        ingest_ip(ip_or_file, program, cidr, asn, ports, service, cves_list, timestamp, report=True)
+
+        # Commit the transaction
+        conn.commit()
+
+    except sqlite3.IntegrityError as e:
+        # Rollback the transaction in case of error
+        conn.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | updating IP | {str(e)}")
+    except Exception as e:
+        # Rollback the transaction in case of any other error
+        conn.rollback()
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | updating IP | {str(e)}")
+
+# Per-port detail of a cidrs row as a JSON array of {"port", "service"}
+PORT_SERVICES_SQL = ("(SELECT json_group_array(json_object('port', port, 'service', service)) "
+                     "FROM (SELECT port, service FROM ip_ports WHERE ip = cidrs.ip AND program = cidrs.program ORDER BY port))")
+
+def cidr_record(row):
+    return {
+        "ip": row[0], "cidr": row[1], "program": row[7], "asn": row[2], 
+        "port": row[3], "service": row[4], "cves": row[8],
+        "ports": json.loads(row[9]),
+        "created_at": format_time(row[5]), "updated_at": format_time(row[6])
+    }
+
+def ip_filters(ip='*', program='*', match='contains', cidr=None, asn=None, port=None, service=None, cves=None,
+               create_time=None, update_time=None):
+    # WHERE clause shared by ip list and delete, so a --count covers exactly the rows a delete removes
+    clauses = time_clauses(create_time, update_time)
+    matches = [('program', program, 'exact'), ('cidr', cidr, None), ('asn', asn, 'exact')]
+    if ip != '*':
+        # An IP or CIDR is an index range scan over ip_key; anything else follows --match
+        ip_range = ip_range_filter(ip)
+        if ip_range:
+            clauses.append(ip_range)
+        else:
+            matches.append(('ip', ip, None))
+    if port:
+        # Exact port match through the ip_ports index: 80 never matches 8080
+        ports = port if isinstance(port, list) else [port]
+        clauses.append((f"(ip, program) IN (SELECT ip, program FROM ip_ports WHERE port IN ({', '.join('?' for _ in ports)}))", ports))
+    if service:
+        # The IP's service or the service seen on any of its ports
+        condition, values = match_clause('service', service, match)
+        clauses.append((f"({condition} OR (ip, program) IN (SELECT ip, program FROM ip_ports WHERE {condition}))", values * 2))
+    if cves:
+        condition, value = cve_filter(cves)
+        clauses.append((f"(ip, program) IN (SELECT ip, program FROM ip_cves WHERE {condition})", [value]))
+
+    return compile_filters(matches, match, clauses)
+
+def list_ip(ip='*', program='*', cidr=None, asn=None, port=None, service=None, 
+            cves=None, brief=False, create_time=None, update_time=None, count=False, 
+            stats_domain=False, stats_cidr=False, stats_asn=False, stats_port=False, stats_top=None, stats_order='count',
+            output_format='json', match='contains'):
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Check if the program exists if program is not '*'
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing IP | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    # Base query for listing IPs
+    try:
+        where, parameters = ip_filters(ip, program, match, cidr=cidr, asn=asn, port=port, service=service, cves=cves,
+                                       create_time=create_time, update_time=update_time)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing IP | {e}")
+        return
+    query = f"SELECT ip, cidr, asn, port, service, created_at, updated_at, program, cves, {PORT_SERVICES_SQL} FROM cidrs" + where
+
+    # If count is requested, modify the query
+    if count:
+        cursor.execute("SELECT COUNT(*) FROM cidrs" + where, parameters)
+        count_result = cursor.fetchone()[0]
+        print(count_result)
+        return
+
+    # Output the requested statistics straight from SQL
+    stats = next((name for name, wanted in (('domain', stats_domain), ('cidr', stats_cidr), ('asn', stats_asn), ('port', stats_port)) if wanted), None)
+    if stats == 'port':
+        # One row per open port, so an IP counts once for each of its ports
+        print_stats(f"""(SELECT ip, program FROM cidrs{where}) m LEFT JOIN ip_ports p ON p.ip = m.ip AND p.program = m.program""",
+                    "COALESCE(p.port, 'none')", 'Port', parameters=parameters, top=stats_top, order=stats_order,
+                    total=f"(SELECT COUNT(*) FROM cidrs{where})")
+        return
+    if stats:
+        print_stats('cidrs', *IP_STATS[stats], where=where, parameters=parameters, top=stats_top, order=stats_order)
+        return
+
+    # Execute the final query
+    cursor.execute(query, parameters)
+    if output_format == 'ndjson' and not brief:
+        write_ndjson(cursor, cidr_record)
+        return
+    ips = cursor.fetchall()
+
+    # Handle output
+    if ips:
+        if brief:
+            unique_ips = set(ip_record[0] for ip_record in ips)  # Use a set for unique IPs
+            print("\n".join(unique_ips))  # Print unique IP addresses
+        else:
+            result = [cidr_record(row) for row in ips]
+            print(json.dumps(result, indent=4))
+
+def delete_ip(ip='*', program='*', asn=None, cidr=None, port=None, service=None, cves=None, match='exact'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # The same WHERE clause `ip list --count` reports on; an IP or CIDR deletes everything inside it
+    try:
+        where, parameters = ip_filters(ip, program, match, cidr=cidr, asn=asn, port=port, service=service, cves=cves)
+    except ValueError as e:
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | deleting IP | {e}")
+        return
+
+    # A single DELETE: its rowcount tells whether anything matched
+    cursor.execute("DELETE FROM cidrs" + where, parameters)
+    if cursor.rowcount == 0:
+        print(f"{timestamp} | error | No matching IP found for deletion with specified filters.")
+        return
+
+    conn.commit()
+    print(f"{timestamp} | success | IP '{ip}' deleted from program '{program}' with specified filters.")
+
+def aggregate_ips(program='*'):
+    # Collapse the stored IPs into the fewest covering CIDRs. Rows arrive sorted by ip_key, so collapsing chunk by
+    # chunk into the running result keeps memory proportional to the output, not to the table
+    import ipaddress
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | aggregating IP | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    query = "SELECT DISTINCT ip_key FROM cidrs WHERE ip_key IS NOT NULL"
+    parameters = []
+    if program != '*':
+        query += " AND program = ?"
+        parameters.append(program)
+    query += " ORDER BY ip_key"
+
+    collapsed = {4: [], 6: []}
+    for chunk in chunked(conn.execute(query, parameters), FETCH_BATCH_SIZE):
+        networks = {4: [], 6: []}
+        for (key,) in chunk:
+            address = key_address(key)
+            networks[address.version].append(ipaddress.ip_network(address))
+        for version in (4, 6):
+            if networks[version]:
+                collapsed[version] = list(ipaddress.collapse_addresses(collapsed[version] + networks[version]))
+
+    for version in (4, 6):
+        for network in collapsed[version]:
+            print(network)
+
+def check_ips(file_path, program='*', brief=False):
+    # Membership test for a list of IPs: stored exactly, inside a stored CIDR, or unknown. One JSON object per input IP
+    import ipaddress
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if not is_line_input(file_path):
+        print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | checking IP | file {Fore.BLUE}{Style.BRIGHT}{file_path}{Style.RESET_ALL} does not exist")
+        return
+
+    # The CIDR column holds few distinct networks; keep them in a set and probe each prefix length of an address
+    query = "SELECT DISTINCT cidr, program FROM cidrs WHERE cidr IS NOT NULL AND cidr != 'none'"
+    parameters = []
+    if program != '*':
+        query += " AND program = ?"
+        parameters.append(program)
+    networks = {}
+    for cidr, cidr_program in conn.execute(query, parameters):
+        try:
+            networks.setdefault(ipaddress.ip_network(cidr.strip(), strict=False), cidr_program)
+        except ValueError:
+            continue
+
+    for chunk in chunked(read_lines(file_path)):
+        keys = {line: ip_key(line) for line in chunk}
+        wanted = [key for key in keys.values() if key is not None]
+        stored = {}
+        if wanted:
+            lookup = f"SELECT ip_key, program FROM cidrs WHERE ip_key IN ({', '.join('?' for _ in wanted)})"
+            lookup_parameters = list(wanted)
+            if program != '*':
+                lookup += " AND program = ?"
+                lookup_parameters.append(program)
+            for key, ip_program in conn.execute(lookup, lookup_parameters):
+                stored.setdefault(key, ip_program)
+
+        for line in chunk:
+            key = keys[line]
+            result = {'ip': line, 'match': None, 'program': None, 'cidr': None}
+            if key in stored:
+                result.update(match='ip', program=stored[key])
+            elif key is not None and networks:
+                address = key_address(key)
+                for prefix in range(address.max_prefixlen, -1, -1):
+                    network = ipaddress.ip_network(f"{address}/{prefix}", strict=False)
+                    if network in networks:
+                        result.update(match='cidr', program=networks[network], cidr=str(network))
+                        break
+            if brief:
+                if result['match']:
+                    print(line)
+            else:
+                print(json.dumps(result, separators=(',', ':')))
+
+def list_cves(cve='*', program='*', ip=None, top=None, brief=False, count=False, output_format='json'):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if program != '*':
+        cursor.execute("SELECT * FROM programs WHERE program = ?", (program,))
+        if not cursor.fetchone():
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing cve | program {Fore.BLUE}{Style.BRIGHT}{program}{Style.RESET_ALL} does not exist")
+            return
+
+    filters = []
+    parameters = []
+    if program != '*':
+        filters.append("c.program = ?")
+        parameters.append(program)
+    if cve != '*':
+        condition, value = cve_filter(cve)
+        filters.append("c." + condition)
+        parameters.append(value)
+    if ip:
+        # Forward lookup: an IP or a whole CIDR, through the ip_key index
+        ip_range = ip_range_filter(ip)
+        if ip_range:
+            filters.append(f"(c.ip, c.program) IN (SELECT ip, program FROM cidrs WHERE {ip_range[0]})")
+            parameters.extend(ip_range[1])
+        else:
+            filters.append("c.ip = ?")
+            parameters.append(ip)
+    where = " WHERE " + " AND ".join(filters) if filters else ""
+
+    # Summary mode: CVEs ranked by affected hosts, with the per-program split computed in SQL
+    if top or (cve == '*' and not ip):
+        query = f"""SELECT cve, SUM(hosts), json_group_object(program, hosts) FROM
+                    (SELECT c.cve AS cve, c.program AS program, COUNT(*) AS hosts FROM ip_cves c{where} GROUP BY c.cve, c.program)
+                    GROUP BY cve ORDER BY 2 DESC, 1"""
+        if top:
+            query += " LIMIT ?"
+            parameters.append(top)
+        cursor.execute(query, parameters)
+        if count:
+            print(len(cursor.fetchall()))
+            return
+        if brief:
+            for row in cursor:
+                print(row[0])
+            return
+        to_record = lambda row: {'cve': row[0], 'hosts': row[1], 'programs': json.loads(row[2])}
+        if output_format == 'ndjson':
+            write_ndjson(cursor, to_record)
+        else:
+            print(json.dumps([to_record(row) for row in cursor.fetchall()], indent=4))
+        return
+
+    # Reverse (CVE -> hosts) and forward (IP -> CVEs) lookups
+    if count:
+        cursor.execute(f"SELECT COUNT(*) FROM ip_cves c{where}", parameters)
+        print(cursor.fetchone()[0])
+        return
+
+    cursor.execute(f"SELECT c.cve, c.ip, c.program, c.first_seen, c.last_seen FROM ip_cves c{where} ORDER BY c.cve, c.program, c.ip", parameters)
+    if brief:
+        # Hosts for a CVE lookup, CVEs for an IP lookup
+        for row in cursor:
+            print(row[0] if ip else row[1])
+        return
+    to_record = lambda row: {'cve': row[0], 'ip': row[1], 'program': row[2], 'first_seen': format_time(row[3]), 'last_seen': format_time(row[4])}
+    if output_format == 'ndjson':
+        write_ndjson(cursor, to_record)
+    else:
+        print(json.dumps([to_record(row) for row in cursor.fetchall()], indent=4))
+
+def change_record(row):
+    return {"seq": row[0], "changed_at": format_time(row[1]), "op": row[2], "type": row[3], "program": row[4], "key": row[5],
+            "fields": json.loads(row[6]) if row[6] else None}
+
+def list_changes(after_seq=0, since=None, program='*', entity=None, limit=None, count=False):
+    # Stream the change log after a sequence number (exclusive) or from a point in time, oldest first, as NDJSON;
+    # a consumer stores the last seq it saw and passes it back as --after-seq next run
+    if since is None:
+        where, parameters = " WHERE seq > ?", [after_seq]
+    else:
+        try:
+            epoch = to_epoch(parse_single_time(since)[0])
+        except ValueError as e:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | listing changes | {e}")
+            return
+        # The changed_at index finds the first seq stamped at or after the time, the rest is a rowid range read in seq
+        # order. changed_at is still checked: rows handed over from a shard keep the time they were logged at
+        where = " WHERE seq >= (SELECT MIN(seq) FROM changes INDEXED BY idx_changes_changed_at WHERE changed_at >= ?) AND changed_at >= ?"
+        parameters = [epoch, epoch]
+    if program != '*':
+        where += " AND program = ?"
+        parameters.append(program)
+    if entity:
+        where += " AND entity = ?"
+        parameters.append(entity)
+
+    if count:
+        cursor.execute("SELECT COUNT(*) FROM changes" + where, parameters)
+        print(cursor.fetchone()[0])
+        return
+
+    query = "SELECT seq, changed_at, op, entity, program, key, fields FROM changes" + where + " ORDER BY seq"
+    if limit:
+        query += " LIMIT ?"
+        parameters.append(limit)
+    write_ndjson(cursor.execute(query, parameters), change_record)
+
+def parse_time_range(time_range_str):
+    # Handle time ranges in the format 'start_time,end_time'
+    times = time_range_str.split(',')
+    if len(times) == 1:
+        # If only one time is provided, assume the end time is the same and use the entire range of that time point
+        start_time, end_time = parse_single_time(times[0])
+    elif len(times) == 2:
+        # If two times are provided, parse the start and end times
+        start_time = parse_single_time(times[0])[0]
+        end_time = parse_single_time(times[1])[1]
+    else:
+        raise ValueError(f"Invalid time range format: {time_range_str}")
+    return start_time, end_time
+
+def parse_single_time(time_str):
+    # Parse a single time and return start and end times
+    formats = ['%Y-%m-%d-%H:%M', '%Y-%m-%d-%H', '%Y-%m-%d', '%Y-%m', '%Y']
+    for fmt in formats:
+        try:
+            start_time = datetime.strptime(time_str, fmt)
+            if fmt == '%Y-%m-%d-%H:%M':
+                end_time = start_time + timedelta(minutes=1) - timedelta(seconds=1)
+            elif fmt == '%Y-%m-%d-%H':
+                end_time = start_time + timedelta(hours=1) - timedelta(seconds=1)
+            elif fmt == '%Y-%m-%d':
+                end_time = start_time + timedelta(days=1) - timedelta(seconds=1)
+            elif fmt == '%Y-%m':
+                end_time = start_time.replace(month=start_time.month % 12 + 1, day=1) - timedelta(seconds=1)
+            elif fmt == '%Y':
+                end_time = start_time.replace(year=start_time.year + 1, month=1, day=1) - timedelta(seconds=1)
+            return start_time, end_time
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid time format: {time_str}")
+
+class GroupedConnection:
+    # Stands in for the module connection inside the daemon. Each request runs in its own savepoint so
+    # commit()/rollback() in the command functions stay local to it, and the daemon commits whole groups
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def commit(self):
+        self._connection.execute("RELEASE request")
+        self._connection.execute("SAVEPOINT request")
+
+    def rollback(self):
+        self._connection.execute("ROLLBACK TO request")
+
+def send_reply(wfile, message):
+    try:
+        wfile.write(json.dumps(message).encode() + b"\n")
+    except OSError:
+        pass  # The client went away (e.g. `| head`); the command still runs to the end and commits
+
+class ReplyStream:
+    # stdout or stderr of a forwarded command: what it prints goes to the client as {"stdout": ...} / {"stderr": ...}
+    # lines whenever REPLY_CHUNK_SIZE characters are pending, so a long listing streams instead of piling up in the daemon
+    def __init__(self, wfile, name):
+        self.wfile = wfile
+        self.name = name
+        self.other = None  # The sibling stream, flushed first so stdout and stderr keep their order
+        self.pending = []
+        self.size = 0
+
+    def write(self, text):
+        if self.other.pending:
+            self.other.flush()
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= REPLY_CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.pending:
+            send_reply(self.wfile, {self.name: "".join(self.pending)})
+            self.pending, self.size = [], 0
+
+# Arguments that may name a file, per command and action. The daemon resolves them against the client's working
+# directory; a value that is no file there stays what it is (a domain, a URL, an IP...)
+FILE_ARGUMENTS = {
+    ('program', 'export'): ['output'],
+    ('program', 'import'): ['file'],
+    ('domain', 'add'): ['domain'],
+    ('subdomain', 'add'): ['subdomain'],
+    ('subdomain', 'route'): ['file'],
+    ('subdomain', 'delete'): ['subdomain'],
+    ('url', 'add'): ['url'],
+    ('url', 'import'): ['file'],
+    ('ip', 'add'): ['ip'],
+    ('ip', 'check'): ['file'],
+}
+
+def resolve_paths(args, cwd):
+    # Rewrite relative file arguments in place instead of changing the whole daemon's working directory
+    action = getattr(args, 'action', None)
+    if (args.command, action) == ('program', 'export') and not args.output:
+        args.output = archive_file(args.program)
+    for name in FILE_ARGUMENTS.get((args.command, action), []):
+        value = getattr(args, name)
+        if value and value != '-':
+            path = os.path.join(cwd, value)
+            if name in ('file', 'output') or os.path.isfile(path):
+                setattr(args, name, path)
+
+def run_request(parser, request, wfile):
+    # Execute one forwarded command line, streaming what it prints to the client; returns its exit status
+    import contextlib
+    import shlex
+
+    stdout, stderr = ReplyStream(wfile, 'stdout'), ReplyStream(wfile, 'stderr')
+    stdout.other, stderr.other = stderr, stdout
+    status = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            args = parser.parse_args(request['argv'])
+            if request.get('cwd'):
+                resolve_paths(args, request['cwd'])
+            if not args.command or args.command == 'serve' or not getattr(args, 'action', None):
+                parser.print_help()
+            else:
+                conn.execute("SAVEPOINT request")
+                try:
+                    dispatch(args)
+                    conn.execute("RELEASE request")
+                except BaseException:
+                    conn.execute("ROLLBACK TO request")
+                    conn.execute("RELEASE request")
+                    raise
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"{Fore.RED}error{Style.RESET_ALL} | {shlex.join(request['argv'])} | {e}", file=sys.stderr)
+            status = 1
+    stdout.flush()
+    stderr.flush()
+    return status
+
+def serve(socket_path=SOCKET_PATH, profile=None):
+    import queue
+    import signal
+    import socketserver
+    import threading
+
+    global conn
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # One warm connection for the daemon's lifetime, with a statement cache big enough for every command's SQL
+    open_database(profile, cached_statements=SERVE_CACHED_STATEMENTS)
+    conn_raw = conn
+    conn = GroupedConnection(conn_raw)
+    parser = build_parser()
+    requests = queue.Queue()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # Newline-delimited JSON: {"argv": [...], "cwd": "..."} in; {"stdout": ...} / {"stderr": ...} chunks out while
+            # the command runs, then {"status": n} once its group is committed. The daemon thread writes the reply
+            for line in self.rfile:
+                done = threading.Event()
+                requests.put((json.loads(line), self.wfile, done))
+                done.wait()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # Left behind by a daemon that did not shut down cleanly
+    # The socket is created 0600 by binding under a 0077 umask, so other users never get a window to connect
+    umask = os.umask(0o077)
+    try:
+        server = Server(socket_path, Handler)
+    finally:
+        os.umask(umask)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"{timestamp} | {Fore.GREEN}success{Style.RESET_ALL} | serving | listening on {Fore.BLUE}{Style.BRIGHT}{socket_path}{Style.RESET_ALL}", flush=True)
+
+    try:
+        # Requests that queue up while one runs share its transaction: one commit (and fsync) per group
+        while True:
+            group = [requests.get()]
+            while len(group) < GROUP_COMMIT_MAX:
+                try:
+                    group.append(requests.get_nowait())
+                except queue.Empty:
+                    break
+
+            conn_raw.execute("BEGIN")
+            statuses = [run_request(parser, request, wfile) for request, wfile, _ in group]
+            try:
+                conn_raw.commit()
+            except sqlite3.DatabaseError as e:
+                conn_raw.rollback()
+                statuses = [1] * len(group)
+                for _, wfile, _ in group:
+                    send_reply(wfile, {'stderr': f"{Fore.RED}error{Style.RESET_ALL} | commit failed, changes discarded: {e}\n"})
+            for (_, wfile, done), status in zip(group, statuses):
+                send_reply(wfile, {'status': status})
+                done.set()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.unlink(socket_path)
+        conn_raw.close()
+
+def forward_command(socket_path, argv):
+    # Client side of `serve`: relays the daemon's output as it arrives and returns its exit status, or None when no
+    # daemon answers
+    import shlex
+    import socket
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        client.sendall(json.dumps({'argv': argv, 'cwd': os.getcwd()}).encode() + b"\n")
+        replies = client.makefile('rb')
+        reply = json.loads(replies.readline())
+    except (OSError, ValueError):
+        # No daemon answered: a stale socket file, another user's socket, or a daemon that dropped the connection
+        # before replying. Run the command locally
+        client.close()
+        return None
+
+    colorama.init()
+    with client:
+        try:
+            while 'status' not in reply:
+                sys.stdout.write(reply.get('stdout', ''))
+                sys.stderr.write(reply.get('stderr', ''))
+                reply = json.loads(replies.readline())
+        except BrokenPipeError:
+            # The consumer stopped reading (e.g. `| head`); silence the flush at interpreter exit
+            sys.stdout = open(os.devnull, 'w')
+            return 0
+        except (OSError, ValueError):
+            print(f"{Fore.RED}error{Style.RESET_ALL} | {shlex.join(argv)} | the daemon closed the connection before the command finished",
+                  file=sys.stderr)
+            return 1
+    return reply['status']
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Manage programs, domains, subdomains, and IPs')
+    parser.add_argument('--profile', choices=list(STORAGE_PROFILES), help='Storage profile for this run (default: $SUBSCOPE_PROFILE or default)')
+    sub_parser = parser.add_subparsers(dest='command')
+
+    # program commands
+    program_parser = sub_parser.add_parser('program', help='Manage programs')
+    program_action_parser = program_parser.add_subparsers(dest='action')
+
+    add_program_parser = program_action_parser.add_parser('add', help='add a new program')
+    add_program_parser.add_argument('program', help='Name of the program')
+    add_program_parser.add_argument('--shard', action='store_true', help='Keep the program in its own database file')
+    
+    list_programs_parser = program_action_parser.add_parser('list', help='List programs')
+    list_programs_parser.add_argument('program', help="program name or wildcard '*' for all programs")
+    list_programs_parser.add_argument('--brief', action='store_true', help='Show only program names')
+    list_programs_parser.add_argument('--count', action='store_true', help='Count the number of returned records')
+
+
+    export_program_parser = program_action_parser.add_parser('export', help='Write a program and everything in it to a gzip NDJSON archive')
+    export_program_parser.add_argument('program', help='Name of the program')
+    export_program_parser.add_argument('-o', '--output', help='Archive file (default <program>.ndjson.gz, - for stdout)')
+    export_program_parser.add_argument('--since', help='Only rows added or updated since this time (e.g. 2024-05-01), plus the deletes since then')
+
+    import_program_parser = program_action_parser.add_parser('import', help='Load a program archive, merging it with what is already stored')
+    import_program_parser.add_argument('file', help='Archive written by program export, or - for stdin')
+    import_program_parser.add_argument('--program', help='Import under this program name instead of the archived one')
+
+    timeline_program_parser = program_action_parser.add_parser('timeline', help='New domains, subdomains, urls and IPs per day')
+    timeline_program_parser.add_argument('program', help="Name of the program, or '*' for all programs")
+    timeline_program_parser.add_argument('--days', type=int, default=90, help='Number of days back from today (default: 90)')
+    timeline_program_parser.add_argument('--domain', help='Only growth under this domain')
+    timeline_program_parser.add_argument('--by-domain', action='store_true', help='One entry per day and domain instead of per day')
+    timeline_program_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+
+    program_action_parser.add_parser('shard', help='Move a program into its own database file').add_argument('program', help='Name of the program')
+    program_action_parser.add_parser('unshard', help='Move a sharded program back into the main database').add_argument('program', help='Name of the program')
+
+    delete_programs_parser = program_action_parser.add_parser('delete', help='Delete a program')
+    delete_programs_parser.add_argument('program', help='Name of the program')
+    delete_programs_parser.add_argument('--all', action='store_true', help='Delete all data related to the program')
+
+
+    # Domain commands
+    domain_parser = sub_parser.add_parser('domain', help='Manage domains in a program')
+    domain_action_parser = domain_parser.add_subparsers(dest='action')
+
+    add_domain_parser = domain_action_parser.add_parser('add', help='Add a domain')
+    add_domain_parser.add_argument('domain', help='Domain name, or a file / - (stdin) with one domain per line')
+    add_domain_parser.add_argument('program', help='Program name')
+    add_domain_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Scope of the domain (leave empty to keep current scope)')
+
+
+    list_domains_parser = domain_action_parser.add_parser('list', help='List domains in a program')
+    list_domains_parser.add_argument('domain', help='Domain name (use "*" for all domains)')
+    list_domains_parser.add_argument('program', help='program name (use "*" for all programs)')
+    list_domains_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Filter domains by scope')
+    list_domains_parser.add_argument('--brief', action='store_true', help='Show only domain names')
+    list_domains_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+    list_domains_parser.add_argument('--count', action='store_true', help='Count the number of returned records')
+    list_domains_parser.add_argument('--match', choices=MATCH_MODES, default='contains', help='How name and text filters match (default contains): exact, prefix, suffix (whole labels for subdomains), glob or regex')
+
+
+    delete_domain_parser = domain_action_parser.add_parser('delete', help='Delete a domain')
+    delete_domain_parser.add_argument('domain', help='Domain name')
+    delete_domain_parser.add_argument('program', help='program name')
+    delete_domain_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Scope of the domain (default: inscope)')
+
+    # Subdomain commands
+    subdomain_parser = sub_parser.add_parser('subdomain', help='Manage subdomains in a program')
+    subdomain_action_parser = subdomain_parser.add_subparsers(dest='action')
+
+    add_subdomain_parser = subdomain_action_parser.add_parser('add', help='Add a subdomain')
+    add_subdomain_parser.add_argument('subdomain', help='Subdomain name, or a file / - (stdin) with one subdomain per line')
+    add_subdomain_parser.add_argument('domain', help='Domain name')
+    add_subdomain_parser.add_argument('program', help='program name')
+    add_subdomain_parser.add_argument('--source', nargs='*', help='Source(s) (comma-separated)')
+    add_subdomain_parser.add_argument('--unsource', nargs='*', help='Source(s) to remove (comma-separated)')
+    add_subdomain_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Scope')
+    add_subdomain_parser.add_argument('--resolved', choices=['yes', 'no'], help='Resolved status')
+    add_subdomain_parser.add_argument('--ip', help='IP address of the subdomain')
+    add_subdomain_parser.add_argument('--unip', action='store_true', help='Remove IP address from the subdomain')
+    add_subdomain_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='CDN status')
+    add_subdomain_parser.add_argument('--cdn_name', help='Name of the CDN provider')
+    add_subdomain_parser.add_argument('--uncdn_name', action='store_true', help='Remove CDN name from the subdomain')
+
+    route_subdomain_parser = subdomain_action_parser.add_parser('route', help='Add hostnames of any domain, each routed to its registered parent domain')
+    route_subdomain_parser.add_argument('file', help='File or - (stdin) with one hostname per line')
+    route_subdomain_parser.add_argument('--program', default='*', help='Only route to domains of this program (default: all programs)')
+    route_subdomain_parser.add_argument('--source', nargs='*', help='Source(s) (comma-separated)')
+    route_subdomain_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Scope')
+    route_subdomain_parser.add_argument('--resolved', choices=['yes', 'no'], help='Resolved status')
+    route_subdomain_parser.add_argument('--ip', help='IP address of the subdomains')
+    route_subdomain_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='CDN status')
+    route_subdomain_parser.add_argument('--cdn_name', help='Name of the CDN provider')
+
+    list_subdomains_parser = subdomain_action_parser.add_parser('list', help='List subdomains')
+    list_subdomains_parser.add_argument('subdomain', help='Subdomain name, * for all, or *.host.example.com for everything below a host')
+    list_subdomains_parser.add_argument('domain', help='Domain name or wildcard')
+    list_subdomains_parser.add_argument('program', help='Program name')
+    list_subdomains_parser.add_argument('--source', nargs='*', help='Filter by source(s)')
+    list_subdomains_parser.add_argument('--source-only', action='store_true', help='Show only matching subdomains')
+    list_subdomains_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Filter by scope')
+    list_subdomains_parser.add_argument('--resolved', choices=['yes', 'no'], help='Filter by resolved status')
+    list_subdomains_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='Filter by CDN status')
+    list_subdomains_parser.add_argument('--ip', help='Filter by IP address')
+    list_subdomains_parser.add_argument('--cdn_name', help='Filter by CDN provider name')
+    list_subdomains_parser.add_argument('--brief', action='store_true', help='Show only subdomain names')
+    list_subdomains_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+    list_subdomains_parser.add_argument('--create_time', help='Filter by creation time')
+    list_subdomains_parser.add_argument('--update_time', help='Filter by last update time')
+    list_subdomains_parser.add_argument('--count', action='store_true', help='Count the number of returned records')
+    list_subdomains_parser.add_argument('--match', choices=MATCH_MODES, default='contains', help='How name and text filters match (default contains): exact, prefix, suffix (whole labels for subdomains), glob or regex')
+    list_subdomains_parser.add_argument('--stats-source', action='store_true', help='Show statistics based on source')
+    list_subdomains_parser.add_argument('--stats-scope', action='store_true', help='Show statistics based on scope')
+    list_subdomains_parser.add_argument('--stats-cdn-status', action='store_true', help='Show statistics based on CDN status')
+    list_subdomains_parser.add_argument('--stats-cdn-name', action='store_true', help='Show statistics based on CDN name')
+    list_subdomains_parser.add_argument('--stats-resolved', action='store_true', help='Show statistics based on resolved status')
+    list_subdomains_parser.add_argument('--stats-ip-address', action='store_true', help='Show statistics based on IP address')
+    list_subdomains_parser.add_argument('--stats-program', action='store_true', help='Show statistics based on program')
+    list_subdomains_parser.add_argument('--stats-domain', action='store_true', help='Show statistics based on domain')
+    list_subdomains_parser.add_argument('--stats-created-at', action='store_true', help='Show statistics based on created time')
+    list_subdomains_parser.add_argument('--stats-updated-at', action='store_true', help='Show statistics based on updated time')
+    list_subdomains_parser.add_argument('--stats-top', type=int, help='Only show the N largest statistics groups')
+    list_subdomains_parser.add_argument('--stats-order', choices=['count', 'value'], default='count', help='Order statistics by group size (default) or by value')
+    list_subdomains_parser.add_argument('--stats-bucket', choices=list(TIME_BUCKETS), default='second', help='Time step of --stats-created-at/--stats-updated-at (default: second)')
+
+
+    delete_subdomain_parser = subdomain_action_parser.add_parser('delete', help='Delete subdomains')
+    delete_subdomain_parser.add_argument('subdomain', help='Subdomain to delete (use * to delete all)')
+    delete_subdomain_parser.add_argument('domain', help='Domain name')
+    delete_subdomain_parser.add_argument('program', help='program name')
+    delete_subdomain_parser.add_argument('--resolved', choices=['yes', 'no'], help='Filter by resolved status')
+    delete_subdomain_parser.add_argument('--source', help='Filter by source')
+    delete_subdomain_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Filter by scope')
+    delete_subdomain_parser.add_argument('--ip', help='Filter by IP address')
+    delete_subdomain_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='Filter by CDN status')
+    delete_subdomain_parser.add_argument('--cdn_name', help='Filter by CDN provider name')
+    delete_subdomain_parser.add_argument('--match', choices=MATCH_MODES, default='exact', help='How name and text filters match (default exact): contains, prefix, suffix (whole labels for subdomains), glob or regex')
+
+    # url commands
+    url_parser = sub_parser.add_parser('url', help='Manage urls')
+    live_action_parser = url_parser.add_subparsers(dest='action')
+
+    add_url_parser = live_action_parser.add_parser('add', help='Add a live subdomain')
+    add_url_parser.add_argument('url', help='URL of the live subdomain, or a file / - (stdin) with one url per line')
+    add_url_parser.add_argument('subdomain', help='Subdomain')
+    add_url_parser.add_argument('domain', help='Domain')
+    add_url_parser.add_argument('program', help='program')
+    add_url_parser.add_argument('--scheme', help='Scheme (http or https)')
+    add_url_parser.add_argument('--method', help='HTTP method')
+    add_url_parser.add_argument('--port', type=int, help='Port number')
+    add_url_parser.add_argument('--status_code', type=int, help='HTTP status code')
+    add_url_parser.add_argument('--scope', choices=['inscope', 'outscope'], help='Scope')
+    add_url_parser.add_argument('--ip', help='IP address')
+    add_url_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='CDN status')
+    add_url_parser.add_argument('--cdn_name', help='Name of the CDN provider')
+    add_url_parser.add_argument('--title', help='Title of the live subdomain')
+    add_url_parser.add_argument('--webserver', help='Web server type')
+    add_url_parser.add_argument('--webtech', help='Web technologies (comma-separated)')
+    add_url_parser.add_argument('--cname', help='CNAME of the live subdomain')
+    add_url_parser.add_argument('--location', help='Redirect location')
+    add_url_parser.add_argument('--flag', help='Specify a flag for url (blank, login, default_page)')
+    add_url_parser.add_argument('--path', help='the path of url')
+    add_url_parser.add_argument('--content_length', help='content_length of url')
+
+
+    import_url_parser = live_action_parser.add_parser('import', help='Import urls from httpx JSON lines output')
+    import_url_parser.add_argument('file', help='httpx JSON lines file (-json output), or - for stdin')
+    import_url_parser.add_argument('program', nargs='?', default='*', help='Only match subdomains of this program (default: all programs)')
+
+    search_url_parser = live_action_parser.add_parser('search', help='Full-text search over url titles, paths, locations, CNAMEs and webservers')
+    search_url_parser.add_argument('query', help='FTS5 query: words, AND / OR / NOT, prefix*, "exact phrase", column filters such as title:jenkins')
+    search_url_parser.add_argument('program', nargs='?', default='*', help='program (use * for all programs)')
+    search_url_parser.add_argument('--limit', type=int, default=100, help='Maximum number of ranked hits (default 100, 0 for all)')
+    search_url_parser.add_argument('--brief', action='store_true', help='Show only urls')
+    search_url_parser.add_argument('--count', action='store_true', help='Count the number of matching urls')
+    search_url_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+
+    list_url_parser = live_action_parser.add_parser('list', help='List urls')
+    list_url_parser.add_argument('url', help='URL of the live subdomain')
+    list_url_parser.add_argument('subdomain', help='Subdomain name, * for all, or *.host.example.com for everything below a host')
+    list_url_parser.add_argument('domain', help='Domain name or wildcard')
+    list_url_parser.add_argument('program', help='program name')
+    list_url_parser.add_argument('--scheme', help='Filter by scheme')
+    list_url_parser.add_argument('--method', help='Filter by HTTP method')
+    list_url_parser.add_argument('--port', type=int, help='Filter by port')
+    list_url_parser.add_argument('--status_code', type=int, help='Filter by HTTP status code')
+    list_url_parser.add_argument('--ip', help='Filter by IP address')
+    list_url_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='Filter by CDN status')
+    list_url_parser.add_argument('--cdn_name', help='Filter by CDN name')
+    list_url_parser.add_argument('--title', help='Filter by title')
+    list_url_parser.add_argument('--webserver', help='Filter by webserver')
+    list_url_parser.add_argument('--webtech', help='Filter by web technology, optionally by version (e.g. nginx, "WordPress<6", PHP:7.4)')
+    list_url_parser.add_argument('--cname', help='Filter by CNAME')
+    list_url_parser.add_argument('--create_time', help='Filter by creation time')
+    list_url_parser.add_argument('--update_time', help='Filter by update time')
+    list_url_parser.add_argument('--brief', action='store_true', help='Show only subdomain names')
+    list_url_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+    list_url_parser.add_argument('--scope', help='Filter by scope')
+    list_url_parser.add_argument('--flag', help='Filter by flag')
+    list_url_parser.add_argument('--path', help='Filter by path')
+    list_url_parser.add_argument('--content_length', help='Filter by content_length')
+    list_url_parser.add_argument('--location', help='Filter by redirect location')
+    list_url_parser.add_argument('--count', action='store_true', help='Count the number of matching URLs')
+    list_url_parser.add_argument('--match', choices=MATCH_MODES, default='contains', help='How name and text filters match (default contains): exact, prefix, suffix (whole labels for subdomains), glob or regex')
+    list_url_parser.add_argument('--stats-subdomain', action='store_true', help='Show statistics based on subdomain')
+    list_url_parser.add_argument('--stats-domain', action='store_true', help='Show statistics based on domain')
+    list_url_parser.add_argument('--stats-program', action='store_true', help='Show statistics based on program')
+    list_url_parser.add_argument('--stats-scheme', action='store_true', help='Show statistics based on scheme')
+    list_url_parser.add_argument('--stats-method', action='store_true', help='Show statistics based on HTTP method')
+    list_url_parser.add_argument('--stats-port', action='store_true', help='Show statistics based on port')
+    list_url_parser.add_argument('--stats-status-code', action='store_true', help='Show statistics based on status code')
+    list_url_parser.add_argument('--stats-scope', action='store_true', help='Show statistics based on scope')
+    list_url_parser.add_argument('--stats-title', action='store_true', help='Show statistics based on title')
+    list_url_parser.add_argument('--stats-ip-address', action='store_true', help='Show statistics based on IP address')
+    list_url_parser.add_argument('--stats-cdn-status', action='store_true', help='Show statistics based on CDN status')
+    list_url_parser.add_argument('--stats-cdn-name', action='store_true', help='Show statistics based on CDN name')
+    list_url_parser.add_argument('--stats-webserver', action='store_true', help='Show statistics based on webserver')
+    list_url_parser.add_argument('--stats-webtech', action='store_true', help='Show statistics per web technology')
+    list_url_parser.add_argument('--stats-cname', action='store_true', help='Show statistics based on CNAME')
+    list_url_parser.add_argument('--stats-location', action='store_true', help='Show statistics based on location')
+    list_url_parser.add_argument('--stats-flag', action='store_true', help='Show statistics based on flag')
+    list_url_parser.add_argument('--stats-path', action='store_true', help='Show statistics based on path')
+    list_url_parser.add_argument('--stats-content-length', action='store_true', help='Show statistics based on content_length')
+    list_url_parser.add_argument('--stats-created-at', action='store_true', help='Show statistics based on creation time')
+    list_url_parser.add_argument('--stats-updated-at', action='store_true', help='Show statistics based on update time')
+    list_url_parser.add_argument('--stats-top', type=int, help='Only show the N largest statistics groups')
+    list_url_parser.add_argument('--stats-order', choices=['count', 'value'], default='count', help='Order statistics by group size (default) or by value')
+    list_url_parser.add_argument('--stats-bucket', choices=list(TIME_BUCKETS), default='second', help='Time step of --stats-created-at/--stats-updated-at (default: second)')
+
+    
+    delete_url_parser = live_action_parser.add_parser('delete', help='Delete urls')
+    delete_url_parser.add_argument('url', help='URL of the live subdomain')
+    delete_url_parser.add_argument('subdomain', help='Subdomain')
+    delete_url_parser.add_argument('domain', help='Domain')
+    delete_url_parser.add_argument('program', help='program')
+    delete_url_parser.add_argument('--scope', help='Filter by scope')
+    delete_url_parser.add_argument('--cdn_status', choices=['yes', 'no'], help='Filter by CDN status')
+    delete_url_parser.add_argument('--port', help='Filter by port')
+    delete_url_parser.add_argument('--cdn_name', help='Filter by cdn name')
+    delete_url_parser.add_argument('--scheme', help='Filter by scheme')
+    delete_url_parser.add_argument('--method', help='Filter by HTTP method')
+    delete_url_parser.add_argument('--path', help='Filter by path')
+    delete_url_parser.add_argument('--flag', help='Filter by flag')
+    delete_url_parser.add_argument('--status_code', help='Filter by HTTP status code')
+    delete_url_parser.add_argument('--content_length', help='Filter by content_length')
+    delete_url_parser.add_argument('--ip', help='Filter by ip address')
+    delete_url_parser.add_argument('--title', help='Filter by title')
+    delete_url_parser.add_argument('--webserver', help='Filter by webserver')
+    delete_url_parser.add_argument('--webtech', help='Filter by web technology, optionally by version (e.g. "WordPress<6")')
+    delete_url_parser.add_argument('--cname', help='Filter by cname')
+    delete_url_parser.add_argument('--location', help='Filter by location')
+    delete_url_parser.add_argument('--match', choices=MATCH_MODES, default='exact', help='How name and text filters match (default exact): contains, prefix, suffix (whole labels for subdomains), glob or regex')
+
+    # IP commands
+    ip_parser = sub_parser.add_parser('ip', help='Manage IPs in a program')
+    ip_action_parser = ip_parser.add_subparsers(dest='action')
+
+    add_ip_parser = ip_action_parser.add_parser('add', help='Add an IP to a program')
+    add_ip_parser.add_argument('ip', help='IP address, or a file / - (stdin) with one IP per line')
+    add_ip_parser.add_argument('program', help='Program name')
+    add_ip_parser.add_argument('--cidr', help='CIDR notation')
+    add_ip_parser.add_argument('--asn', help='Autonomous System Number')
+    add_ip_parser.add_argument('--port', type=int, nargs='+', help='One or more port numbers')
+    add_ip_parser.add_argument('--service', help='Service on the IP')
+    add_ip_parser.add_argument('--cves', nargs='+', help='Comma-separated CVEs associated with the IP (merged with the known ones)')
+
+    list_ips_parser = ip_action_parser.add_parser('list', help='List IPs in a program')
+    list_ips_parser.add_argument('ip', help='IP or CIDR, matched by address range (use * for all IPs)')
+    list_ips_parser.add_argument('program', help='program (use * for all programs)')
+    list_ips_parser.add_argument('--cidr', help='Filter by CIDR')
+    list_ips_parser.add_argument('--asn', help='Filter by ASN')
+    list_ips_parser.add_argument('--port', type=int, help='Filter by port')
+    list_ips_parser.add_argument('--service', help='Filter by service')
+    list_ips_parser.add_argument('--cves', help='Filter by CVEs')  # Added this line
+    list_ips_parser.add_argument('--brief', action='store_true', help='Show only IP addresses')
+    list_ips_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+    list_ips_parser.add_argument('--create_time', help='Filter by creation time')
+    list_ips_parser.add_argument('--update_time', help='Filter by update time')
+    list_ips_parser.add_argument('--count', action='store_true', help='Show count of matching IPs')
+    list_ips_parser.add_argument('--match', choices=MATCH_MODES, default='contains', help='How name and text filters match (default contains): exact, prefix, suffix (whole labels for subdomains), glob or regex')
+    list_ips_parser.add_argument('--stats-domain', action='store_true', help='Show statistics by domain')
+    list_ips_parser.add_argument('--stats-cidr', action='store_true', help='Show statistics by CIDR')
+    list_ips_parser.add_argument('--stats-asn', action='store_true', help='Show statistics by ASN')
+    list_ips_parser.add_argument('--stats-port', action='store_true', help='Show statistics by port')
+    list_ips_parser.add_argument('--stats-top', type=int, help='Only show the N largest statistics groups')
+    list_ips_parser.add_argument('--stats-order', choices=['count', 'value'], default='count', help='Order statistics by group size (default) or by value')
+
+    delete_ip_parser = ip_action_parser.add_parser('delete', help='Delete IPs')
+    delete_ip_parser.add_argument('ip', help='IP or CIDR (use * for all IPs)')  # Specify IP or CIDR
+    delete_ip_parser.add_argument('program', help='program (use * for all programs)')  # Specify program
+    delete_ip_parser.add_argument('--port', type=int, help='Filter by port')  # Optional port filter
+    delete_ip_parser.add_argument('--service', help='Filter by service')  # Optional service filter
+    delete_ip_parser.add_argument('--asn', help='Filter by ASN')  # Optional ASN filter
+    delete_ip_parser.add_argument('--cidr', help='Filter by CIDR')  # Optional CIDR filter
+    delete_ip_parser.add_argument('--cves', help='Filter by CVEs')  # Optional CVEs filter
+    delete_ip_parser.add_argument('--match', choices=MATCH_MODES, default='exact', help='How name and text filters match (default exact): contains, prefix, suffix (whole labels for subdomains), glob or regex')
+
+    aggregate_ip_parser = ip_action_parser.add_parser('aggregate', help='Collapse stored IPs into covering CIDRs')
+    aggregate_ip_parser.add_argument('program', nargs='?', default='*', help='program (default: all programs)')
+
+    check_ip_parser = ip_action_parser.add_parser('check', help='Check a list of IPs against stored IPs and CIDRs')
+    check_ip_parser.add_argument('file', help='File or - (stdin) with one IP per line')
+    check_ip_parser.add_argument('program', nargs='?', default='*', help='program (default: all programs)')
+    check_ip_parser.add_argument('--brief', action='store_true', help='Only print the IPs that match')
+
+    # CVE commands
+    cve_parser = sub_parser.add_parser('cve', help='Look up CVEs of IPs and IPs of CVEs')
+    cve_action_parser = cve_parser.add_subparsers(dest='action')
+
+    list_cve_parser = cve_action_parser.add_parser('list', help='Hosts affected by a CVE, CVEs of an IP, or the top CVEs')
+    list_cve_parser.add_argument('cve', nargs='?', default='*', help='CVE id or prefix such as CVE-2024 (default *: summary of all CVEs)')
+    list_cve_parser.add_argument('program', nargs='?', default='*', help='program (use * for all programs)')
+    list_cve_parser.add_argument('--ip', help='Only CVEs of this IP or CIDR')
+    list_cve_parser.add_argument('--top', type=int, help='Summary of the N CVEs affecting the most hosts, with per-program counts')
+    list_cve_parser.add_argument('--brief', action='store_true', help='Show only IPs (or CVEs for --ip and summaries)')
+    list_cve_parser.add_argument('--count', action='store_true', help='Count the number of returned records')
+    list_cve_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='Output format: one JSON document (default) or one object per line, streamed')
+
+    # Change feed
+    changes_parser = sub_parser.add_parser('changes', help='Stream inserts, updates and deletes recorded since a point, as NDJSON')
+    changes_parser.set_defaults(action='list')
+    changes_since = changes_parser.add_mutually_exclusive_group()
+    changes_since.add_argument('--after-seq', type=int, default=0, help='Last sequence number already processed (default 0: everything)')
+    changes_since.add_argument('--since', help='Changes from this time on, such as 2024, 2024-05-01 or 2024-05-01-10:30')
+    changes_parser.add_argument('--program', default='*', help='Only changes in this program')
+    changes_parser.add_argument('--type', choices=['domain', 'subdomain', 'url', 'ip'], help='Only changes to this kind of record')
+    changes_parser.add_argument('--limit', type=int, help='Return at most N changes; continue with --after-seq and the last seq printed')
+    changes_parser.add_argument('--count', action='store_true', help='Count the pending changes instead of printing them')
+
+    # Daemon
+    serve_parser = sub_parser.add_parser('serve', help='Run a daemon that executes commands sent over a Unix socket')
+    serve_parser.add_argument('--socket', default=SOCKET_PATH, help='Socket path (default: $SUBSCOPE_SOCKET or <database>.sock)')
+
+    return parser
+
+def run(args, databases=None):
+    # Handle commands; databases are the open shard files of a cross-program import, see open_shards()
+    if args.command == 'program':
+        if args.action == 'add':
+            add_program(program=args.program)
+            if args.shard:
+                shard_program(args.program)
+        elif args.action == 'shard':
+            shard_program(args.program)
+        elif args.action == 'unshard':
+            unshard_program(args.program)
+        elif args.action == 'list':
+            list_programs(program=args.program, brief=args.brief, count=args.count)
+        elif args.action == 'delete':
+            delete_program(program=args.program, delete_all=args.all)
+        elif args.action == 'timeline':
+            program_timeline(args.program, days=args.days, domain=args.domain, by_domain=args.by_domain, output_format=args.format)
+        elif args.action == 'export':
+            export_program(args.program, args.output, since=args.since)
+        elif args.action == 'import':
+            import_program(args.file, program=args.program)
+
+    elif args.command == 'domain':
+        if args.action == 'add':
+            add_domain(args.domain, args.program, scope=args.scope)
+        elif args.action == 'list':
+            list_domains(args.domain, args.program, brief=args.brief, count=args.count, scope=args.scope, output_format=args.format,
+                         match=args.match)
+        elif args.action == 'delete':
+            delete_domain(args.domain if args.domain != '*' else '*', args.program, scope=args.scope)
+
+    elif args.command == 'subdomain':
+        if args.action == 'add':
+            add_subdomain(args.subdomain, args.domain, args.program, sources=args.source, unsources=args.unsource, 
+                          scope=args.scope, resolved=args.resolved, ip_address=args.ip, unip=args.unip, cdn_status=args.cdn_status, 
+                          cdn_name=args.cdn_name, uncdn_name=args.uncdn_name)
+
+        elif args.action == 'route':
+            route_subdomains(args.file, args.program, sources=args.source, scope=args.scope, resolved=args.resolved,
+                             ip_address=args.ip, cdn_status=args.cdn_status, cdn_name=args.cdn_name, databases=databases)
+            
+        elif args.action == 'list':
+            list_subdomains(subdomain=args.subdomain, domain=args.domain, program=args.program, sources=args.source,
+                            scope=args.scope, resolved=args.resolved, brief=args.brief, source_only=args.source_only,
+                            cdn_status=args.cdn_status, ip=args.ip, cdn_name=args.cdn_name, count=args.count,
+                            create_time=args.create_time, update_time=args.update_time, stats_source=args.stats_source,
+                            stats_scope=args.stats_scope, stats_cdn_status=args.stats_cdn_status, stats_cdn_name=args.stats_cdn_name,
+                            stats_resolved=args.stats_resolved, stats_ip_address=args.stats_ip_address, stats_domain=args.stats_domain, 
+                            stats_program=args.stats_program, stats_created_at=args.stats_created_at, stats_updated_at=args.stats_updated_at,
+                            stats_top=args.stats_top, stats_order=args.stats_order, stats_bucket=args.stats_bucket, output_format=args.format,
+                            match=args.match)
+            
+        elif args.action == 'delete':
+            if os.path.isfile(args.subdomain):
+                with open(args.subdomain, 'r') as file:
+                    subdomains = [line.strip() for line in file.readlines() if line.strip()]
+                for subdomain in subdomains:
+                    delete_subdomain(subdomain, args.domain, args.program, args.scope, args.source, args.resolved, match=args.match)
+            else:
+                delete_subdomain(args.subdomain, args.domain, args.program, args.scope, args.source, args.resolved, args.ip, args.cdn_status,
+                                 args.cdn_name, match=args.match)
+
+    elif args.command == 'url':
+        if args.action == 'add':
+            add_url(args.url, args.subdomain, args.domain, args.program, scheme=args.scheme, method=args.method, port=args.port, status_code=args.status_code,
+                    ip_address=args.ip, cdn_status=args.cdn_status, cdn_name=args.cdn_name, title=args.title, webserver=args.webserver, webtech=args.webtech,
+                    cname=args.cname, scope=args.scope, location=args.location, flag=args.flag, content_length=args.content_length, path=args.path)
+            
+        elif args.action == 'import':
+            import_urls(args.file, args.program, databases=databases)
+
+        elif args.action == 'search':
+            search_urls(args.query, args.program, limit=args.limit, brief=args.brief, count=args.count, output_format=args.format)
+
+        elif args.action == 'list':
+            list_urls(args.url, args.subdomain, args.domain, args.program, scheme=args.scheme, method=args.method, port=args.port,
+                      status_code=args.status_code, ip=args.ip, cdn_status=args.cdn_status, cdn_name=args.cdn_name, title=args.title,
+                      webserver=args.webserver, webtech=args.webtech, cname=args.cname, create_time=args.create_time, update_time=args.update_time,
+                      brief=args.brief, scope=args.scope, location=args.location, count=args.count, stats_domain=args.stats_domain,
+                      stats_program=args.stats_program, stats_subdomain=args.stats_subdomain, stats_cdn_name=args.stats_cdn_name,
+                      stats_cdn_status=args.stats_cdn_status, stats_cname=args.stats_cname, stats_created_at=args.stats_created_at,
+                      stats_ip_address=args.stats_ip_address, stats_location=args.stats_location, stats_method=args.stats_method,
+                      stats_port=args.stats_port, stats_scheme=args.stats_scheme, stats_scope=args.stats_scope, stats_status_code=args.stats_status_code,
+                      stats_title=args.stats_title, stats_updated_at=args.stats_updated_at, stats_webserver=args.stats_webserver, 
+                      stats_webtech=args.stats_webtech, flag=args.flag, path=args.path, content_length=args.content_length, stats_content_length=args.stats_content_length,
+                      stats_flag=args.stats_flag, stats_path=args.stats_path, stats_top=args.stats_top, stats_order=args.stats_order, stats_bucket=args.stats_bucket,
+                      output_format=args.format, match=args.match)
+            
+        elif args.action == 'delete':
+            delete_url(args.url, args.subdomain, args.domain, args.program, scheme=args.scheme, method=args.method, port=args.port,
+                       status_code=args.status_code, ip_address=args.ip, cdn_status=args.cdn_status, cdn_name=args.cdn_name,
+                       title=args.title, webserver=args.webserver, webtech=args.webtech, cname=args.cname, scope=args.scope, 
+                       location=args.location, path=args.path, flag=args.flag, content_length=args.content_length, match=args.match)
+            
+    elif args.command == 'ip':
+        if args.action == 'add':
+            add_ip(args.ip, args.program, args.cidr, args.asn, args.port, args.service, args.cves)
+            
+        elif args.action == 'list':
+            list_ip(args.ip, args.program, cidr=args.cidr, asn=args.asn, port=args.port, service=args.service,
+                    brief=args.brief, cves=args.cves, create_time=args.create_time, update_time=args.update_time, count=args.count,
+                    stats_asn=args.stats_asn, stats_cidr=args.stats_cidr, stats_domain=args.stats_domain, stats_port=args.stats_port,
+                    stats_top=args.stats_top, stats_order=args.stats_order, output_format=args.format, match=args.match)
+            
+        elif args.action == 'delete':
+            delete_ip(ip=args.ip, program=args.program, asn=args.asn, cidr=args.cidr, port=args.port, service=args.service, cves=args.cves,
+                      match=args.match)
+
+        elif args.action == 'aggregate':
+            aggregate_ips(args.program)
+
+        elif args.action == 'check':
+            check_ips(args.file, args.program, brief=args.brief)
+
+    elif args.command == 'changes':
+        list_changes(args.after_seq, args.since, args.program, entity=args.type, limit=args.limit, count=args.count)
+
+    elif args.command == 'cve':
+        if args.action == 'list':
+            list_cves(args.cve, args.program, ip=args.ip, top=args.top, brief=args.brief, count=args.count, output_format=args.format)
+
+# Commands that only read, so a cross-program run can go through the TEMP VIEWs over all shards
+READ_ACTIONS = {'list', 'aggregate', 'check', 'timeline', 'search'}
+
+# Imports that route every input record to its program: a cross-program run reads the input once and writes each
+# record to its program's file, instead of reading it again per file (stdin can only be read once)
+ROUTED_ACTIONS = {('subdomain', 'route'), ('url', 'import')}
+
+def run_on(program, path, args):
+    # Run a command against a program's shard file, leaving the module connection as it was. The shard's triggers can
+    # only log into the shard itself; collect_changes() then moves what they logged to the catalogue's change log
+    global conn, cursor
+    saved = conn, cursor
+    catalogue = database_file()
+    open_database(args.profile, path=path)
+    shard = conn
+    try:
+        # Reads of the change log (export --since) see the catalogue's through a TEMP VIEW, like attach_shards does
+        shard.execute("ATTACH DATABASE ? AS catalogue", (catalogue,))
+        shard.execute("CREATE TEMP VIEW changes AS SELECT * FROM catalogue.changes")
+        run(args)
+    finally:
+        conn, cursor = saved
+        try:
+            collect_changes(program, shard)
+        finally:
+            shard.close()
+
+def collect_all_changes(shards):
+    # Pick up whatever the shards logged and have not handed over yet (a run interrupted before collecting)
+    global conn, cursor
+    saved = conn, cursor
+    catalogue = database_file()
+    for program, path in shards.items():
+        open_database(path=path)  # A shard on an older schema still stamps local-time text
+        shard = conn
+        conn, cursor = saved
+        try:
+            shard.execute("ATTACH DATABASE ? AS catalogue", (catalogue,))
+            collect_changes(program, shard)
+        finally:
+            shard.close()
+
+def run_federated(args, paths):
+    # Run a read on a fresh catalogue connection with every shard attached (ATTACH is not allowed inside the
+    # daemon's open transaction); the shards are brought to the current schema first
+    global conn, cursor
+    saved = conn, cursor
+    catalogue = database_file()
+    for path in paths:
+        open_database(args.profile, path=path)
+        conn.close()
+    open_database(args.profile, path=catalogue)
+    try:
+        attach_shards(conn, paths)
+        run(args)
+    finally:
+        conn.close()
+        conn, cursor = saved
+
+def dispatch(args):
+    # Send the command to the database holding its program: a shard's own file, or the catalogue database for
+    # unsharded programs. Cross-program reads run once over the attached shards, cross-program writes run per file
+    shards = shard_paths()
+    program = getattr(args, 'program', None)
+    if not shards or (args.command == 'program' and (args.action in ('shard', 'unshard') or (args.action == 'delete' and (args.all or program in shards)))):
+        run(args)
+    elif args.command == 'changes':
+        # The change log is the catalogue's alone: one sequence, so a --since cursor never skips or repeats a change
+        collect_all_changes(shards)
+        run(args)
+    elif program in shards:
+        run_on(program, shards[program], args)
+    elif program == '*' and (args.command, args.action) in ROUTED_ACTIONS:
+        databases = open_shards(shards, args.profile)
+        try:
+            run(args, databases)
+        finally:
+            close_shards(databases)
+    elif program == '*' or (args.command == 'program' and args.action == 'list'):  # program list takes a pattern
+        if args.action not in READ_ACTIONS:
+            if '-' in [getattr(args, name) for name in FILE_ARGUMENTS.get((args.command, args.action), [])]:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | {args.command} {args.action} | every program means one run per "
+                      f"database file, and stdin can only be read once: pass the records in a file")
+                return
+            run(args)
+            for name, path in shards.items():
+                run_on(name, path, args)
+        elif len(shards) <= ATTACH_LIMIT:
+            run_federated(args, list(shards.values()))
+        else:
+            # Run file by file, a listing, count or stats table would come out once per file instead of as one result
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{timestamp} | {Fore.RED}error{Style.RESET_ALL} | {args.command} {args.action} | reading every program needs all {len(shards)} "
+                  f"database files attached together, SQLite attaches at most {ATTACH_LIMIT}: name a program, or unshard some")
+    else:
+        run(args)
+
+def main():
+    # Hand the command to a running daemon when there is one; it answers with a warm connection
+    argv = sys.argv[1:]
+    # stdin input stays local, and so do moves between database files, which must not wait on the daemon's transaction
+    local = '-' in argv or '--shard' in argv or argv[:2] in (['program', 'shard'], ['program', 'unshard'])
+    if argv[:1] != ['serve'] and not local and os.path.exists(SOCKET_PATH):
+        status = forward_command(SOCKET_PATH, argv)
+        if status is not None:
+            sys.exit(status)
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.socket, args.profile)
+        return
+
+    # Nothing to run: show help without touching the database
+    if not args.command or not getattr(args, 'action', None):
+        parser.print_help()
+        return
+
+    colorama.init()
+    open_database(args.profile)
+    dispatch(args)
+
+    # Close the database connection when done
+    conn.close()
+
+if __name__ == "__main__":
+    main()